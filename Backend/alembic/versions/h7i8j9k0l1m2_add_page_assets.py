@@ -0,0 +1,49 @@
+"""Add content-addressed page and PDF assets
+
+Revision ID: h7i8j9k0l1m2
+Revises: g6h7i8j9k0l1
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'h7i8j9k0l1m2'
+down_revision: Union[str, None] = 'g6h7i8j9k0l1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'page_assets',
+        sa.Column('content_hash', sa.String(64), primary_key=True),
+        sa.Column('image_url', sa.String(), nullable=False),
+        sa.Column('cloudinary_public_id', sa.String(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('detections_key', sa.String(), nullable=True),
+        sa.Column('detections', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+    )
+
+    op.create_table(
+        'pdf_assets',
+        sa.Column('sha256', sa.String(64), primary_key=True),
+        sa.Column('page_hashes', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+    )
+
+    op.add_column('pages', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.create_index('ix_pages_content_hash', 'pages', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pages_content_hash', table_name='pages')
+    op.drop_column('pages', 'content_hash')
+    op.drop_table('pdf_assets')
+    op.drop_table('page_assets')
@@ -0,0 +1,28 @@
+"""Add DeepZoom pyramid descriptors to pages and page assets
+
+Revision ID: i8j9k0l1m2n3
+Revises: h7i8j9k0l1m2
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'i8j9k0l1m2n3'
+down_revision: Union[str, None] = 'h7i8j9k0l1m2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('page_assets', sa.Column('pyramid', sa.JSON(), nullable=True))
+    op.add_column('pages', sa.Column('pyramid', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pages', 'pyramid')
+    op.drop_column('page_assets', 'pyramid')
@@ -0,0 +1,30 @@
+"""Add thumbnail and preview URLs to pages and page assets
+
+Revision ID: j9k0l1m2n3o4
+Revises: i8j9k0l1m2n3
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'j9k0l1m2n3o4'
+down_revision: Union[str, None] = 'i8j9k0l1m2n3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('page_assets', 'pages'):
+        op.add_column(table, sa.Column('thumbnail_url', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('preview_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in ('pages', 'page_assets'):
+        op.drop_column(table, 'preview_url')
+        op.drop_column(table, 'thumbnail_url')
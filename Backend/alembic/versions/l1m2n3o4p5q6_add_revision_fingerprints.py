@@ -0,0 +1,28 @@
+"""Add raster fingerprints and previous-revision links for incremental detection
+
+Revision ID: l1m2n3o4p5q6
+Revises: k0l1m2n3o4p5
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l1m2n3o4p5q6'
+down_revision: Union[str, None] = 'k0l1m2n3o4p5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('page_assets', sa.Column('fingerprint', sa.LargeBinary(), nullable=True))
+    op.add_column('pages', sa.Column('previous_content_hash', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pages', 'previous_content_hash')
+    op.drop_column('page_assets', 'fingerprint')
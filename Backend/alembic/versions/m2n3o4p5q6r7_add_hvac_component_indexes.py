@@ -0,0 +1,39 @@
+"""Add trigram tag index and keyset pagination index to hvac_components
+
+Revision ID: m2n3o4p5q6r7
+Revises: l1m2n3o4p5q6
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm2n3o4p5q6r7'
+down_revision: Union[str, None] = 'l1m2n3o4p5q6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_hvac_components_tag_trgm',
+        'hvac_components',
+        ['tag'],
+        postgresql_using='gin',
+        postgresql_ops={'tag': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_hvac_components_project_created',
+        'hvac_components',
+        ['project_id', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hvac_components_project_created', table_name='hvac_components')
+    op.drop_index('ix_hvac_components_tag_trgm', table_name='hvac_components')
@@ -0,0 +1,186 @@
+"""Add per-project takeoff totals maintained by triggers
+
+Revision ID: n3o4p5q6r7s8
+Revises: m2n3o4p5q6r7
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n3o4p5q6r7s8'
+down_revision: Union[str, None] = 'm2n3o4p5q6r7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION takeoff_detection_apply(p_project text, p_class text, p_sign integer)
+RETURNS void AS $$
+BEGIN
+    IF p_sign > 0 THEN
+        INSERT INTO project_class_totals (project_id, class_name, detection_count)
+        VALUES (p_project, p_class, 1)
+        ON CONFLICT (project_id, class_name) DO UPDATE
+        SET detection_count = project_class_totals.detection_count + 1;
+    ELSE
+        -- Never insert on removal: the project itself may be going away
+        UPDATE project_class_totals
+        SET detection_count = detection_count - 1
+        WHERE project_id = p_project AND class_name = p_class;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION takeoff_detection_change()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM takeoff_detection_apply(OLD.project_id, OLD.class_name, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM takeoff_detection_apply(NEW.project_id, NEW.class_name, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION takeoff_component_apply(
+    p_project text, p_class text, p_section text, p_boq text,
+    p_quantity integer, p_cost numeric, p_sign integer
+)
+RETURNS void AS $$
+BEGIN
+    IF p_sign > 0 THEN
+        INSERT INTO project_class_totals (project_id, class_name, component_count, quantity)
+        VALUES (p_project, p_class, 1, COALESCE(p_quantity, 0))
+        ON CONFLICT (project_id, class_name) DO UPDATE
+        SET component_count = project_class_totals.component_count + 1,
+            quantity = project_class_totals.quantity + EXCLUDED.quantity;
+
+        INSERT INTO project_section_totals (project_id, section, boq_code, component_count, quantity, total_cost)
+        VALUES (p_project, COALESCE(p_section, ''), COALESCE(p_boq, ''), 1,
+                COALESCE(p_quantity, 0), COALESCE(p_cost, 0))
+        ON CONFLICT (project_id, section, boq_code) DO UPDATE
+        SET component_count = project_section_totals.component_count + 1,
+            quantity = project_section_totals.quantity + EXCLUDED.quantity,
+            total_cost = project_section_totals.total_cost + EXCLUDED.total_cost;
+    ELSE
+        UPDATE project_class_totals
+        SET component_count = component_count - 1,
+            quantity = quantity - COALESCE(p_quantity, 0)
+        WHERE project_id = p_project AND class_name = p_class;
+
+        UPDATE project_section_totals
+        SET component_count = component_count - 1,
+            quantity = quantity - COALESCE(p_quantity, 0),
+            total_cost = total_cost - COALESCE(p_cost, 0)
+        WHERE project_id = p_project
+          AND section = COALESCE(p_section, '')
+          AND boq_code = COALESCE(p_boq, '');
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION takeoff_component_change()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM takeoff_component_apply(OLD.project_id, OLD.class_name, OLD.section, OLD.boq_code,
+                                        OLD.quantity, OLD.total_cost, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM takeoff_component_apply(NEW.project_id, NEW.class_name, NEW.section, NEW.boq_code,
+                                        NEW.quantity, NEW.total_cost, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_detections_takeoff
+AFTER INSERT OR DELETE ON detections
+FOR EACH ROW EXECUTE FUNCTION takeoff_detection_change();
+
+CREATE TRIGGER trg_detections_takeoff_update
+AFTER UPDATE OF project_id, class_name ON detections
+FOR EACH ROW
+WHEN (OLD.project_id IS DISTINCT FROM NEW.project_id OR OLD.class_name IS DISTINCT FROM NEW.class_name)
+EXECUTE FUNCTION takeoff_detection_change();
+
+CREATE TRIGGER trg_hvac_components_takeoff
+AFTER INSERT OR DELETE ON hvac_components
+FOR EACH ROW EXECUTE FUNCTION takeoff_component_change();
+
+CREATE TRIGGER trg_hvac_components_takeoff_update
+AFTER UPDATE OF project_id, class_name, section, boq_code, quantity, total_cost ON hvac_components
+FOR EACH ROW
+WHEN (
+    OLD.project_id IS DISTINCT FROM NEW.project_id
+    OR OLD.class_name IS DISTINCT FROM NEW.class_name
+    OR OLD.section IS DISTINCT FROM NEW.section
+    OR OLD.boq_code IS DISTINCT FROM NEW.boq_code
+    OR OLD.quantity IS DISTINCT FROM NEW.quantity
+    OR OLD.total_cost IS DISTINCT FROM NEW.total_cost
+)
+EXECUTE FUNCTION takeoff_component_change();
+"""
+
+BACKFILL_SQL = """
+INSERT INTO project_class_totals (project_id, class_name, detection_count, component_count, quantity)
+SELECT project_id, class_name, SUM(detections), SUM(components), SUM(quantity)
+FROM (
+    SELECT project_id, class_name, COUNT(*) AS detections, 0 AS components, 0 AS quantity
+    FROM detections GROUP BY project_id, class_name
+    UNION ALL
+    SELECT project_id, class_name, 0, COUNT(*), COALESCE(SUM(quantity), 0)
+    FROM hvac_components GROUP BY project_id, class_name
+) AS totals
+GROUP BY project_id, class_name;
+
+INSERT INTO project_section_totals (project_id, section, boq_code, component_count, quantity, total_cost)
+SELECT project_id, COALESCE(section, ''), COALESCE(boq_code, ''), COUNT(*),
+       COALESCE(SUM(quantity), 0), COALESCE(SUM(total_cost), 0)
+FROM hvac_components
+GROUP BY project_id, COALESCE(section, ''), COALESCE(boq_code, '');
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_class_totals',
+        sa.Column('project_id', sa.String(), sa.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('class_name', sa.String(), primary_key=True),
+        sa.Column('detection_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('component_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('quantity', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+    op.create_table(
+        'project_section_totals',
+        sa.Column('project_id', sa.String(), sa.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('section', sa.String(100), primary_key=True),
+        sa.Column('boq_code', sa.String(100), primary_key=True),
+        sa.Column('component_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('quantity', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('total_cost', sa.Numeric(16, 2), nullable=False, server_default='0'),
+    )
+
+    op.execute(BACKFILL_SQL)
+    op.execute(TRIGGER_SQL)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS trg_hvac_components_takeoff_update ON hvac_components')
+    op.execute('DROP TRIGGER IF EXISTS trg_hvac_components_takeoff ON hvac_components')
+    op.execute('DROP TRIGGER IF EXISTS trg_detections_takeoff_update ON detections')
+    op.execute('DROP TRIGGER IF EXISTS trg_detections_takeoff ON detections')
+    op.execute('DROP FUNCTION IF EXISTS takeoff_component_change()')
+    op.execute('DROP FUNCTION IF EXISTS takeoff_component_apply(text, text, text, text, integer, numeric, integer)')
+    op.execute('DROP FUNCTION IF EXISTS takeoff_detection_change()')
+    op.execute('DROP FUNCTION IF EXISTS takeoff_detection_apply(text, text, integer)')
+    op.drop_table('project_section_totals')
+    op.drop_table('project_class_totals')
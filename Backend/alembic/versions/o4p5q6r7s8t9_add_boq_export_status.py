@@ -0,0 +1,36 @@
+"""Add background job status and progress to boq_exports
+
+Revision ID: o4p5q6r7s8t9
+Revises: n3o4p5q6r7s8
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o4p5q6r7s8t9'
+down_revision: Union[str, None] = 'n3o4p5q6r7s8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('boq_exports', sa.Column('status', sa.String(20), nullable=False, server_default='completed'))
+    op.add_column('boq_exports', sa.Column('progress', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('boq_exports', sa.Column('total_rows', sa.Integer(), nullable=True))
+    op.add_column('boq_exports', sa.Column('error', sa.String(), nullable=True))
+    op.add_column('boq_exports', sa.Column('completed_at', sa.DateTime(), nullable=True))
+    op.alter_column('boq_exports', 'file_url', existing_type=sa.String(), nullable=True)
+
+
+def downgrade() -> None:
+    op.alter_column('boq_exports', 'file_url', existing_type=sa.String(), nullable=False)
+    op.drop_column('boq_exports', 'completed_at')
+    op.drop_column('boq_exports', 'error')
+    op.drop_column('boq_exports', 'total_rows')
+    op.drop_column('boq_exports', 'progress')
+    op.drop_column('boq_exports', 'status')
@@ -0,0 +1,36 @@
+"""Add searchable text column to page_vectors
+
+Revision ID: p5q6r7s8t9u0
+Revises: o4p5q6r7s8t9
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p5q6r7s8t9u0'
+down_revision: Union[str, None] = 'o4p5q6r7s8t9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows extracted earlier keep NULL text; search still scans those pages
+    op.add_column('page_vectors', sa.Column('text', sa.Text(), nullable=True))
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_page_vectors_text_trgm',
+        'page_vectors',
+        ['text'],
+        postgresql_using='gin',
+        postgresql_ops={'text': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_page_vectors_text_trgm', table_name='page_vectors')
+    op.drop_column('page_vectors', 'text')
@@ -0,0 +1,44 @@
+"""Backfill hvac_components.created_at and make it NOT NULL
+
+Revision ID: q6r7s8t9u0v1
+Revises: p5q6r7s8t9u0
+Create Date: 2026-10-20 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'q6r7s8t9u0v1'
+down_revision: Union[str, None] = 'p5q6r7s8t9u0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination orders by (created_at, id); NULLs would never page
+    op.execute(
+        "UPDATE hvac_components "
+        "SET created_at = COALESCE(updated_at, now() AT TIME ZONE 'utc') "
+        "WHERE created_at IS NULL"
+    )
+    op.alter_column(
+        'hvac_components',
+        'created_at',
+        existing_type=sa.DateTime(),
+        nullable=False,
+        server_default=sa.text("(now() AT TIME ZONE 'utc')"),
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'hvac_components',
+        'created_at',
+        existing_type=sa.DateTime(),
+        nullable=True,
+        server_default=None,
+    )
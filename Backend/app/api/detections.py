@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.api.deps import get_db
 from app.schemas.detections import (
@@ -11,13 +12,44 @@ from app.schemas.detections import (
     BatchSyncResponse
 )
 from app.services.detection_service import DetectionService
+from app.services.detection_encoding import (
+    BINARY_MEDIA_TYPE,
+    COLUMNAR_MEDIA_TYPE,
+    encode_binary,
+    encode_columnar,
+    negotiate_format,
+)
 
 router = APIRouter(prefix="/detections", tags=["Detections"])
 
 # ✅ MATCHES FRONTEND: getPageDetections(pageId) -> GET /api/detections/pages/{pageId}
 @router.get("/pages/{page_id}", response_model=List[DetectionResponse])
-def get_page_detections(page_id: str, db: Session = Depends(get_db)):
-    return DetectionService(db).get_detections_by_page(page_id)
+def get_page_detections(
+    page_id: str,
+    request: Request,
+    format: Optional[str] = Query(None, description="json | columnar | binary"),
+    db: Session = Depends(get_db),
+):
+    fmt = negotiate_format(request.headers.get("accept"), format)
+    headers = {"Vary": "Accept"}
+    service = DetectionService(db)
+
+    if fmt == "json":
+        # Rows already match DetectionResponse; skip per-object validation
+        return ORJSONResponse(service.get_detection_rows_by_page(page_id), headers=headers)
+
+    rows = service.get_box_rows_by_page(page_id)
+    if fmt == "columnar":
+        return ORJSONResponse(
+            {"page_id": page_id, **encode_columnar(rows)},
+            media_type=COLUMNAR_MEDIA_TYPE,
+            headers=headers,
+        )
+    return Response(
+        encode_binary(rows, {"page_id": page_id}),
+        media_type=BINARY_MEDIA_TYPE,
+        headers=headers,
+    )
 
 # ✅ MATCHES FRONTEND: createDetection(pageId, data) -> POST /api/detections/pages/{pageId}
 @router.post("/pages/{page_id}", response_model=DetectionResponse)
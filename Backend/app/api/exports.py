@@ -0,0 +1,31 @@
+from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.schemas.export import BoqExportCreate, BoqExportRead
+from app.services.boq_export_service import BoqExportService, run_export
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+@router.post("", response_model=BoqExportRead, status_code=202)
+def create_boq_export(
+    payload: BoqExportCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """Start a CSV / XLSX BOQ export; poll GET /exports/{id} for progress"""
+    export = BoqExportService(db).create_export(payload.project_id, payload.user_id, payload.format)
+    background_tasks.add_task(run_export, export.id)
+    return export
+
+@router.get("/projects/{project_id}", response_model=List[BoqExportRead])
+def get_project_exports(project_id: str, db: Session = Depends(get_db)):
+    return BoqExportService(db).get_project_exports(project_id)
+
+@router.get("/{export_id}", response_model=BoqExportRead)
+def get_boq_export(export_id: str, db: Session = Depends(get_db)):
+    export = BoqExportService(db).get_export(export_id)
+    if not export:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return export
@@ -1,9 +1,11 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.services.hvac_component_service import HVACComponentService
+from app.services.takeoff_service import TakeoffService
 from app.schemas.hvac_components import (
     # HVAC Component schemas
     HVACComponentCreate,
@@ -11,6 +13,8 @@ from app.schemas.hvac_components import (
     HVACComponentResponse,
     HVACComponentBulkCreate,
     HVACComponentBulkResponse,
+    HVACComponentBulkUpdate,
+    HVACComponentBulkUpdateResponse,
     # Material schemas
     MaterialCreate,
     MaterialUpdate,
@@ -23,6 +27,8 @@ from app.schemas.hvac_components import (
     ModelCreate,
     ModelUpdate,
     ModelResponse,
+    # Takeoff schemas
+    TakeoffSummary,
 )
 
 router = APIRouter()
@@ -33,6 +39,31 @@ def get_hvac_service(db: Session = Depends(get_db)) -> HVACComponentService:
     return HVACComponentService(db)
 
 
+def catalog_response(request: Request, payload, etag: str) -> Response:
+    """JSON response with an ETag; 304 when the client's copy is current"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    client_etags = {
+        tag.strip().removeprefix("W/")
+        for tag in request.headers.get("if-none-match", "").split(",")
+    }
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(payload, headers=headers)
+
+
+# ==============================
+# CATALOG ENDPOINT
+# ==============================
+
+@router.get("/catalog")
+def get_catalog(
+    request: Request,
+    service: HVACComponentService = Depends(get_hvac_service)
+):
+    """Materials and manufacturers (with their models) in one response"""
+    return catalog_response(request, *service.catalog_tree())
+
+
 # ==============================
 # HVAC COMPONENT ENDPOINTS
 # ==============================
@@ -61,19 +92,64 @@ def get_hvac_component(
 @router.get("/projects/{project_id}/components", response_model=List[HVACComponentResponse])
 def get_project_hvac_components(
     project_id: str,
-    tag: str = None,
+    response: Response,
+    tag: Optional[str] = None,
+    category: Optional[str] = None,
+    class_name: Optional[str] = None,
+    section: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
     service: HVACComponentService = Depends(get_hvac_service)
 ):
-    """Get all HVAC components for a project, optionally filtered by tag"""
-    components = service.get_components_by_project(project_id)
-    
-    # Filter by tag if provided
-    if tag:
-        components = [c for c in components if c.tag and tag.lower() in c.tag.lower()]
-    
+    """
+    Get HVAC components for a project, filtered in the database.
+
+    With `limit`, results are paged; the cursor for the next page is sent in
+    the X-Next-Cursor header. With `fields`, only those columns are returned.
+    """
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    components, next_cursor = service.query_project_components(
+        project_id,
+        tag=tag,
+        category=category,
+        class_name=class_name,
+        section=section,
+        limit=limit,
+        cursor=cursor,
+        fields=field_list,
+    )
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if field_list:
+        # Sparse rows bypass the full response model
+        return ORJSONResponse(components, headers=headers)
+
+    response.headers.update(headers)
     return components
 
 
+@router.get("/projects/{project_id}/takeoff", response_model=TakeoffSummary)
+def get_project_takeoff(
+    project_id: str,
+    db: Session = Depends(get_db)
+):
+    """Quantity takeoff totals per class and per BOQ section"""
+    return TakeoffService(db).get_takeoff(project_id)
+
+
+@router.get("/pages/{page_id}/detections")
+def get_page_detections_with_components(
+    page_id: str,
+    service: HVACComponentService = Depends(get_hvac_service)
+):
+    """
+    All detections of a page, each with its HVAC component properties and
+    material/manufacturer/model names (`component` is null when none exists).
+    """
+    return ORJSONResponse(service.get_page_detections_with_components(page_id))
+
+
 @router.get("/detections/{detection_id}/component", response_model=HVACComponentResponse)
 def get_component_by_detection(
     detection_id: str,
@@ -86,6 +162,22 @@ def get_component_by_detection(
     return component
 
 
+@router.patch("/components/bulk", response_model=HVACComponentBulkUpdateResponse)
+def bulk_update_hvac_components(
+    bulk_update: HVACComponentBulkUpdate,
+    service: HVACComponentService = Depends(get_hvac_service)
+):
+    """Apply one patch to the components matching ids AND filters, in a single UPDATE"""
+    updated = service.bulk_update_components(
+        bulk_update.patch.model_dump(exclude_unset=True),
+        ids=bulk_update.ids,
+        project_id=bulk_update.project_id,
+        page_id=bulk_update.page_id,
+        class_name=bulk_update.class_name,
+    )
+    return {"updated": updated}
+
+
 @router.patch("/components/{component_id}", response_model=HVACComponentResponse)
 def update_hvac_component(
     component_id: str,
@@ -123,10 +215,11 @@ def bulk_create_hvac_components(
 
 @router.get("/materials", response_model=List[MaterialResponse])
 def get_all_materials(
+    request: Request,
     service: HVACComponentService = Depends(get_hvac_service)
 ):
     """Get all materials"""
-    return service.get_all_materials()
+    return catalog_response(request, *service.catalog_materials())
 
 
 @router.post("/materials", response_model=MaterialResponse, status_code=201)
@@ -178,10 +271,11 @@ def delete_material(
 
 @router.get("/manufacturers", response_model=List[ManufacturerResponse])
 def get_all_manufacturers(
+    request: Request,
     service: HVACComponentService = Depends(get_hvac_service)
 ):
     """Get all manufacturers"""
-    return service.get_all_manufacturers()
+    return catalog_response(request, *service.catalog_manufacturers())
 
 
 @router.post("/manufacturers", response_model=ManufacturerResponse, status_code=201)
@@ -234,10 +328,11 @@ def delete_manufacturer(
 @router.get("/manufacturers/{manufacturer_id}/models", response_model=List[ModelResponse])
 def get_manufacturer_models(
     manufacturer_id: str,
+    request: Request,
     service: HVACComponentService = Depends(get_hvac_service)
 ):
     """Get all models for a manufacturer"""
-    return service.get_models_by_manufacturer(manufacturer_id)
+    return catalog_response(request, *service.catalog_models(manufacturer_id))
 
 
 @router.post("/models", response_model=ModelResponse, status_code=201)
@@ -252,13 +347,14 @@ def create_model(
 @router.get("/models/{model_id}", response_model=ModelResponse)
 def get_model(
     model_id: str,
+    request: Request,
     service: HVACComponentService = Depends(get_hvac_service)
 ):
     """Get model by ID"""
-    model = service.get_model_by_id(model_id)
+    model, etag = service.catalog_model(model_id)
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
-    return model
+    return catalog_response(request, model, etag)
 
 
 @router.patch("/models/{model_id}", response_model=ModelResponse)
@@ -1,10 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
-from app.services.pdf_service import get_model_status
+from app.services.inference_service import (
+    InferenceError,
+    get_inference_status,
+    warmup_inference,
+)
 
 router = APIRouter()
 
 
 @router.get("/model-status")
 def model_status():
-    return get_model_status()
+    return get_inference_status()
+
+
+@router.post("/model-status/warmup")
+def warmup_model():
+    """Load the model now instead of on the first detection request"""
+    try:
+        return warmup_inference()
+    except InferenceError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
@@ -1,10 +1,50 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from app.api.deps import get_db
+from app.models.pages import Page
 from app.services.pdf_service import PDFService
+from app.services.detection_encoding import COLUMNAR_MEDIA_TYPE, negotiate_format
+from app.services.vector_extraction_service import PageVectorService
 
 router = APIRouter(prefix="/projects", tags=["Pages"])
 
 @router.get("/{project_id}/pages")
-def get_pages(project_id: str, db: Session = Depends(get_db)):
-    return PDFService(db).get_project_pages(project_id)
+def get_pages(
+    project_id: str,
+    request: Request,
+    format: Optional[str] = Query(None, description="json | columnar"),
+    db: Session = Depends(get_db),
+):
+    fmt = negotiate_format(request.headers.get("accept"), format, allowed=("json", "columnar"))
+    return ORJSONResponse(
+        PDFService(db).get_project_pages(project_id, columnar=fmt == "columnar"),
+        media_type=COLUMNAR_MEDIA_TYPE if fmt == "columnar" else None,
+        headers={"Vary": "Accept"},
+    )
+
+@router.get("/{project_id}/pages/{page_id}/vectors")
+def get_page_vectors(project_id: str, page_id: str, db: Session = Depends(get_db)):
+    """Text and line segments extracted from the PDF, in page pixel coordinates"""
+    page = (
+        db.query(Page)
+        .filter(Page.id == page_id, Page.project_id == project_id)
+        .first()
+    )
+    if not page:
+        raise HTTPException(status_code=404, detail="Page not found")
+    return PageVectorService(db).get_page_vectors(page)
+
+@router.get("/{project_id}/text-search")
+def search_page_text(
+    project_id: str,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(200, ge=1, le=2000),
+    db: Session = Depends(get_db),
+):
+    """Find words in the PDF text of a project's pages"""
+    return {
+        "query": q,
+        "results": PageVectorService(db).search_text(project_id, q, limit),
+    }
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.schemas.projects import ProjectCreate, ProjectRead
 from app.services.project_service import ProjectService
+from app.services.detection_encoding import COLUMNAR_MEDIA_TYPE, negotiate_format
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
@@ -46,25 +49,17 @@ def delete_project(project_id: str, db: Session = Depends(get_db)):
     ProjectService(db).delete_project(project_id)
 
 @router.get("/{project_id}/pages")
-def get_project_pages(project_id: str, db: Session = Depends(get_db)):
-    """Get all pages and bounding boxes for a project"""
-    from app.services.pdf_service import PDFService
-    return PDFService(db).get_project_pages(project_id)
-
-@router.post("/{project_id}/upload")
-async def upload_pdf(
+def get_project_pages(
     project_id: str,
-    file: UploadFile = File(...),
+    request: Request,
+    format: Optional[str] = Query(None, description="json | columnar"),
     db: Session = Depends(get_db),
 ):
-    """Upload PDF and convert to images stored in Cloudinary"""
-    # ... (Same logic as before, just ensuring imports match if you copy-paste the whole file)
+    """Get all pages and bounding boxes for a project"""
     from app.services.pdf_service import PDFService
-    
-    # Check if project already has pages (re-importing Page to avoid circular deps if needed)
-    # But strictly for this file, you can just call the service:
-    return await PDFService(db).upload_and_convert(project_id, file)
-
-# (Note: For the upload_pdf route above, I abbreviated the imports for clarity. 
-# If you didn't change imports, the previous `uploads.py` logic was fine. 
-# The MAIN FIX is the `list_projects` function at the top.)
\ No newline at end of file
+    fmt = negotiate_format(request.headers.get("accept"), format, allowed=("json", "columnar"))
+    return ORJSONResponse(
+        PDFService(db).get_project_pages(project_id, columnar=fmt == "columnar"),
+        media_type=COLUMNAR_MEDIA_TYPE if fmt == "columnar" else None,
+        headers={"Vary": "Accept"},
+    )
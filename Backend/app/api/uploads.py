@@ -1,14 +1,22 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form, Request, Header
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 import uuid
 
 from app.api.deps import get_db
+from app.models.projects import Project
 from app.services.pdf_service import PDFService
 from app.services.cloudinary_service import CloudinaryService
+from app.services.upload_spool import MAX_PDF_SIZE, spool_upload
+from app.services.upload_session_service import UploadSessionService
+from app.services.multipart_stream import iter_file_parts
+from app.schemas.uploads import UploadSessionCreate, UploadSessionStatus
 
 router = APIRouter(prefix="/projects", tags=["Uploads"])
 
+MAX_PAGE_IMAGE_SIZE = 100 * 1024 * 1024
+
 @router.post("/{project_id}/upload")
 async def upload_pdf(
     project_id: str,
@@ -16,21 +24,69 @@ async def upload_pdf(
     db: Session = Depends(get_db),
 ):
     """Upload PDF and convert to images stored in Cloudinary"""
-    # Check if project already has pages
-    
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files allowed")
     
-    # Check file size (max 25MB)
-    await file.seek(0)
-    file_content = await file.read()
-    if len(file_content) > 500 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size too large. Max 500MB allowed")
-    
-    # Reset file pointer
-    await file.seek(0)
-    
-    return await PDFService(db).upload_and_convert(project_id, file)
+    # Stream to disk in chunks; the size limit (500MB) is enforced as bytes arrive
+    spooled = await spool_upload(file, max_bytes=MAX_PDF_SIZE, suffix=".pdf")
+    with spooled:
+        return await PDFService(db).upload_and_convert(project_id, spooled.path, spooled.sha256)
+
+# Resumable chunked upload: init -> PUT chunks at offset -> complete
+@router.post("/{project_id}/uploads", response_model=UploadSessionStatus, status_code=201)
+def create_upload_session(
+    project_id: str,
+    payload: UploadSessionCreate,
+    db: Session = Depends(get_db),
+):
+    """Start a resumable PDF upload"""
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    return UploadSessionService().create(
+        project_id, payload.filename, payload.total_size, payload.sha256
+    )
+
+@router.get("/{project_id}/uploads/{upload_id}", response_model=UploadSessionStatus)
+def get_upload_session(project_id: str, upload_id: str):
+    """Current offset of an upload, used to resume after a dropped connection"""
+    return UploadSessionService().get(upload_id, project_id)
+
+@router.put("/{project_id}/uploads/{upload_id}", response_model=UploadSessionStatus)
+async def put_upload_chunk(
+    project_id: str,
+    upload_id: str,
+    offset: int,
+    request: Request,
+    x_chunk_sha256: str = Header(None),
+):
+    """Append a raw chunk (request body) at `offset`; X-Chunk-SHA256 is verified if sent"""
+    return await UploadSessionService().write_chunk(
+        upload_id, project_id, offset, request.stream(), x_chunk_sha256
+    )
+
+@router.post("/{project_id}/uploads/{upload_id}/complete")
+async def complete_upload_session(
+    project_id: str,
+    upload_id: str,
+    db: Session = Depends(get_db),
+):
+    """Verify the assembled PDF and convert it to pages"""
+    sessions = UploadSessionService()
+    # Hashing the assembled file is disk-bound; keep it off the event loop
+    upload = await run_in_threadpool(sessions.complete, upload_id, project_id)
+    try:
+        result = await PDFService(db).upload_and_convert(project_id, upload["path"], upload["sha256"])
+    except BaseException:
+        # Keep the assembled file so the client can retry complete
+        sessions.reopen(upload_id)
+        raise
+    sessions.delete(upload_id)
+    return result
+
+@router.delete("/{project_id}/uploads/{upload_id}", status_code=204)
+def abort_upload_session(project_id: str, upload_id: str):
+    """Discard a resumable upload"""
+    UploadSessionService().abort(upload_id, project_id)
 
 @router.post("/{project_id}/upload-pages")
 async def upload_pre_converted_pages(
@@ -60,6 +116,21 @@ async def upload_pre_converted_pages(
     
     return await PDFService(db).upload_pre_converted_pages(project_id, page_files)
 
+@router.post("/{project_id}/pages/stream")
+async def upload_page_stream(
+    project_id: str,
+    request: Request,
+    append: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Upload any number of page images in one multipart request.
+    Each file part becomes a page, in order, as soon as it has arrived;
+    with append=true pages are added after the existing ones.
+    """
+    parts = iter_file_parts(request, max_part_size=MAX_PAGE_IMAGE_SIZE)
+    return await PDFService(db).upload_page_stream(project_id, parts, append=append)
+
 # Additional Cloudinary endpoints
 @router.post("/upload-image")
 async def upload_image(file: UploadFile = File(...)):
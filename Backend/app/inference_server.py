@@ -0,0 +1,120 @@
+"""
+Standalone Inference Server
+
+Owns the YOLO model and serves page detection requests from API workers
+over a local Unix socket, so detection runs never stall CRUD traffic and
+inference capacity can be scaled independently of the API.
+
+Run:
+    python -m app.inference_server --socket /tmp/takeoff-inference.sock
+
+Then start the API with INFERENCE_SOCKET pointing at the same path.
+Requests are pickled frames (multiprocessing.connection) carrying a
+shared-memory descriptor for the page pixels, so client and server must
+run on the same host. Only trusted local clients should be able to reach
+the socket, so set INFERENCE_AUTHKEY on both sides in shared environments.
+"""
+import os
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Listener, AuthenticationError
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.inference_service import (
+    INFERENCE_SOCKET,
+    InferenceError,
+    detect_local,
+    get_authkey,
+    get_local_status,
+    warmup_model,
+)
+from app.services.shared_image import SharedImage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/tmp/takeoff-inference.sock"
+
+
+def handle_request(request: dict) -> dict:
+    """Dispatch a single request frame and build the reply frame."""
+    op = request.get("op")
+
+    if op == "status":
+        return {"ok": True, "status": get_local_status()}
+
+    if op == "warmup":
+        if not warmup_model(force=True):
+            return {"ok": False, "error": get_local_status()["warmup"]["error"], "status_code": 503}
+        return {"ok": True}
+
+    if op == "detect":
+        try:
+            # Attach to the client's page buffer; tiles are views into it
+            with SharedImage.attach(request["image"]) as shared:
+                detections = detect_local(
+                    shared.array,
+                    use_tiling=request.get("use_tiling", True),
+                    confidence=request.get("confidence", 0.25),
+                    tile_ids=request.get("tile_ids"),
+                )
+            return {"ok": True, "detections": detections}
+        except InferenceError as e:
+            return {"ok": False, "error": e.message, "status_code": e.status_code}
+        except Exception as e:
+            logger.exception("Inference failed")
+            return {"ok": False, "error": f"AI detection failed: {type(e).__name__}", "status_code": 500}
+
+    return {"ok": False, "error": f"Unknown operation: {op}", "status_code": 400}
+
+
+def handle_connection(conn):
+    """Serve requests on one client connection until it closes."""
+    with conn:
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+            conn.send(handle_request(request))
+
+
+def serve(socket_path: str, workers: int):
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    # The server exists to own the model, so warm it before accepting work
+    warmup_model()
+
+    with Listener(socket_path, family="AF_UNIX", authkey=get_authkey()) as listener, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        os.chmod(socket_path, 0o660)
+        logger.info("Inference server listening on %s (%d workers)", socket_path, workers)
+
+        while True:
+            try:
+                conn = listener.accept()
+            except AuthenticationError:
+                logger.warning("Rejected inference client with bad authkey")
+                continue
+            except OSError as e:
+                logger.warning("Failed to accept inference client: %s", e)
+                continue
+            pool.submit(handle_connection, conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HVAC takeoff inference server")
+    parser.add_argument("--socket", default=INFERENCE_SOCKET or DEFAULT_SOCKET)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("INFERENCE_WORKERS", "4")))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    serve(args.socket, args.workers)
+
+
+if __name__ == "__main__":
+    main()
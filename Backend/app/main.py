@@ -1,12 +1,18 @@
 import time
 import logging
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from app.core.database import engine
-from app.models import users, projects, detections, members, boqexports, pages, hvac_components
+from app.services.inference_service import (
+    INFERENCE_SOCKET,
+    MODEL_WARMUP,
+    start_background_warmup,
+    warmup_model,
+)
+from app.models import users, projects, detections, members, boqexports, pages, hvac_components, page_assets, page_vectors, takeoff_totals
 
 from app.api import (
     projects as projects_api,
@@ -17,6 +23,7 @@ from app.api import (
     teams as teams_api,
     model_status as model_status_api,
     hvac_components as hvac_components_api,
+    exports as exports_api,
 )
 
 load_dotenv()
@@ -28,6 +35,7 @@ print("✓ Database configured (Alembic managed)")
 app = FastAPI(
     title="HVAC AI Backend",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # ----------------------------
@@ -53,8 +61,23 @@ app.include_router(uploads.router, prefix="/api")
 app.include_router(pages_api.router, prefix="/api")
 app.include_router(detections_api.router, prefix="/api")
 app.include_router(hvac_components_api.router, prefix="/api/hvac")
+app.include_router(exports_api.router, prefix="/api")
 app.include_router(model_status_api.router)
 
+# ----------------------------
+# STARTUP
+# ----------------------------
+@app.on_event("startup")
+def warm_model():
+    # Off by default so CRUD-only workers never import torch; when an
+    # inference server is configured it owns the model instead
+    if INFERENCE_SOCKET:
+        return
+    if MODEL_WARMUP == "startup":
+        warmup_model()
+    elif MODEL_WARMUP == "background":
+        start_background_warmup()
+
 # ----------------------------
 # LOGGING
 # ----------------------------
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, ForeignKey, DateTime
+from sqlalchemy import String, Integer, ForeignKey, DateTime
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
@@ -14,6 +14,14 @@ class BoqExport(Base):
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
 
     format: Mapped[str] = mapped_column(String)
-    file_url: Mapped[str] = mapped_column(String)
+    # Set once the background job has uploaded the file
+    file_url: Mapped[str] = mapped_column(String, nullable=True)
+
+    # pending -> running -> completed | failed
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    progress: Mapped[int] = mapped_column(Integer, default=0)
+    total_rows: Mapped[int] = mapped_column(Integer, nullable=True)
+    error: Mapped[str] = mapped_column(String, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
@@ -11,6 +11,7 @@ from sqlalchemy import (
     Enum,
     DateTime,
     Numeric,
+    Index,
     UniqueConstraint
 )
 from sqlalchemy.dialects.postgresql import UUID
@@ -164,7 +165,8 @@ class HVACComponent(Base):
     # AUDIT
     # =====================
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # NOT NULL: keyset pagination orders by (created_at, id)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # =====================
@@ -174,3 +176,15 @@ class HVACComponent(Base):
     material = relationship("Material")
     manufacturer = relationship("Manufacturer")
     model = relationship("Model")
+
+    __table_args__ = (
+        # Keyset pagination of a project's components
+        Index("ix_hvac_components_project_created", "project_id", "created_at", "id"),
+        # Substring (ILIKE) search on tags; needs the pg_trgm extension
+        Index(
+            "ix_hvac_components_tag_trgm",
+            "tag",
+            postgresql_using="gin",
+            postgresql_ops={"tag": "gin_trgm_ops"},
+        ),
+    )
@@ -0,0 +1,41 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, JSON, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class PageAsset(Base):
+    """A stored page raster, addressed by the SHA-256 of the rendered raster file."""
+    __tablename__ = "page_assets"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    image_url: Mapped[str] = mapped_column(String, nullable=False)
+    cloudinary_public_id: Mapped[str] = mapped_column(String, nullable=False)
+    width: Mapped[int] = mapped_column(Integer, default=0)
+    height: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Downscaled copies for page strips and dashboards
+    thumbnail_url: Mapped[str] = mapped_column(String, nullable=True)
+    preview_url: Mapped[str] = mapped_column(String, nullable=True)
+
+    # DeepZoom descriptor when a tile pyramid was built (see page_raster_service)
+    pyramid: Mapped[dict] = mapped_column(JSON, nullable=True)
+
+    # Last AI result for this raster, keyed by method/model/threshold
+    detections_key: Mapped[str] = mapped_column(String, nullable=True)
+    detections: Mapped[list] = mapped_column(JSON, nullable=True)
+    # Downsampled grayscale copy for diffing revisions (see revision_diff_service)
+    fingerprint: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class PdfAsset(Base):
+    """Page rasters produced by a given PDF file, addressed by its SHA-256."""
+    __tablename__ = "pdf_assets"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    page_hashes: Mapped[list] = mapped_column(JSON, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,37 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, Float, DateTime, LargeBinary, Text, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class PageVector(Base):
+    """
+    Text and line geometry extracted from a PDF page, keyed like the page
+    raster it was rendered to (see page_assets). Coordinates are in raster
+    pixels, so they line up with detections.
+    """
+    __tablename__ = "page_vectors"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    word_count: Mapped[int] = mapped_column(Integer, default=0)
+    segment_count: Mapped[int] = mapped_column(Integer, default=0)
+    # PDF points -> raster pixels (render DPI / 72)
+    scale: Mapped[float] = mapped_column(Float, nullable=False)
+
+    # Compressed .npz of column arrays (see vector_extraction_service)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # The page's words, one per line, so text search can filter in SQL
+    text: Mapped[str] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Substring (ILIKE) search on page text; needs the pg_trgm extension
+        Index(
+            "ix_page_vectors_text_trgm",
+            "text",
+            postgresql_using="gin",
+            postgresql_ops={"text": "gin_trgm_ops"},
+        ),
+    )
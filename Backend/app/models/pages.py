@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Integer, ForeignKey, DateTime
+from sqlalchemy import String, Integer, ForeignKey, DateTime, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
@@ -21,6 +21,18 @@ class Page(Base):
     width: Mapped[int] = mapped_column(Integer, default=0)
     height: Mapped[int] = mapped_column(Integer, default=0)
 
+    # SHA-256 of the stored raster (see page_assets) for dedup and result reuse
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True, index=True)
+    # Raster of the same sheet in the set this upload replaced, if it changed
+    previous_content_hash: Mapped[str] = mapped_column(String(64), nullable=True)
+
+    # Small renditions so navigators don't load the 300-DPI raster
+    thumbnail_url: Mapped[str] = mapped_column(String, nullable=True)
+    preview_url: Mapped[str] = mapped_column(String, nullable=True)
+
+    # DeepZoom tile pyramid descriptor, if one was generated
+    pyramid: Mapped[dict] = mapped_column(JSON, nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     # Relationships
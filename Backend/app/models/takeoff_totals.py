@@ -0,0 +1,33 @@
+from decimal import Decimal
+from sqlalchemy import String, Integer, BigInteger, Numeric, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+# Both tables are maintained by database triggers on detections and
+# hvac_components (see the add_takeoff_totals migration); never write them.
+
+class ProjectClassTotal(Base):
+    """Running detection / component totals of one class in a project."""
+    __tablename__ = "project_class_totals"
+
+    project_id: Mapped[str] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    class_name: Mapped[str] = mapped_column(String, primary_key=True)
+
+    detection_count: Mapped[int] = mapped_column(Integer, default=0)
+    component_count: Mapped[int] = mapped_column(Integer, default=0)
+    quantity: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class ProjectSectionTotal(Base):
+    """Running component totals of one BOQ section / code in a project."""
+    __tablename__ = "project_section_totals"
+
+    project_id: Mapped[str] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    # '' when the components have no section / BOQ code
+    section: Mapped[str] = mapped_column(String(100), primary_key=True)
+    boq_code: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    component_count: Mapped[int] = mapped_column(Integer, default=0)
+    quantity: Mapped[int] = mapped_column(BigInteger, default=0)
+    total_cost: Mapped[Decimal] = mapped_column(Numeric(16, 2), default=0)
@@ -3,9 +3,17 @@ from datetime import datetime
 
 class BoqExportCreate(ORMBase):
     project_id: str
+    user_id: str
     format: str
 
 class BoqExportRead(ORMBase):
     id: str
+    project_id: str
+    format: str
+    status: str
+    progress: int = 0
+    total_rows: int | None = None
+    error: str | None = None
     file_url: str | None
     created_at: datetime
+    completed_at: datetime | None = None
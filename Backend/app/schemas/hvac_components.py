@@ -182,3 +182,52 @@ class HVACComponentBulkCreate(BaseModel):
 class HVACComponentBulkResponse(BaseModel):
     created: list[HVACComponentResponse]
     failed: list[dict]
+
+
+class HVACComponentBulkUpdate(BaseModel):
+    """
+    Patch applied to the components matching all given criteria: the listed
+    ids (if any) AND every filter set. Without ids, project_id or page_id is required.
+    """
+    ids: Optional[list[str]] = Field(None, min_length=1, description="Component IDs to update; filters narrow this list")
+    project_id: Optional[str] = None
+    page_id: Optional[str] = None
+    class_name: Optional[str] = None
+    patch: HVACComponentUpdate
+
+
+class HVACComponentBulkUpdateResponse(BaseModel):
+    updated: int
+
+
+# ==============================
+# TAKEOFF SUMMARY
+# ==============================
+
+class TakeoffClassTotal(BaseModel):
+    class_name: str
+    detection_count: int
+    component_count: int
+    quantity: int
+
+
+class TakeoffSectionTotal(BaseModel):
+    section: Optional[str] = None
+    boq_code: Optional[str] = None
+    component_count: int
+    quantity: int
+    total_cost: Decimal
+
+
+class TakeoffTotals(BaseModel):
+    detection_count: int
+    component_count: int
+    quantity: int
+    total_cost: Decimal
+
+
+class TakeoffSummary(BaseModel):
+    project_id: str
+    classes: list[TakeoffClassTotal]
+    sections: list[TakeoffSectionTotal]
+    totals: TakeoffTotals
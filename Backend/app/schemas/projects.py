@@ -16,4 +16,5 @@ class ProjectRead(ProjectBase):
     status: ProjectStatus
     page_count: int
     total_detections: int
+    thumbnail_url: str | None = None
     created_at: datetime
@@ -0,0 +1,17 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    total_size: int = Field(..., gt=0, description="Size of the whole file in bytes")
+    sha256: Optional[str] = Field(None, description="Optional SHA-256 of the whole file, verified on completion")
+
+
+class UploadSessionStatus(BaseModel):
+    upload_id: str
+    project_id: str
+    filename: str
+    total_size: int
+    offset: int = Field(..., description="Bytes stored so far; the next chunk must start here")
+    status: str = Field("open", description="open, or completing once /complete has started")
@@ -0,0 +1,252 @@
+"""
+BOQ Export
+
+Builds a project's bill of quantities as CSV or XLSX in the background.
+Rows are streamed from a server-side cursor and written to the file as
+they arrive, so memory stays flat no matter how many components a
+project has. The finished file goes to storage and its `boq_exports`
+row records status, progress and the file URL.
+"""
+import os
+import csv
+import uuid
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, func
+
+from app.core.database import SessionLocal
+from app.models.boqexports import BoqExport
+from app.models.detections import Detection
+from app.models.pages import Page
+from app.models.projects import Project
+from app.models.users import User
+from app.models.hvac_components import HVACComponent, Material, Manufacturer, Model
+from app.services.base import BaseService
+from app.services.cloudinary_service import CloudinaryService
+from app.services.upload_spool import UPLOAD_SPOOL_DIR
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "xlsx")
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# Progress is written back every this many rows
+EXPORT_PROGRESS_EVERY = 5000
+# Jobs still pending/running this long after creation lost their worker
+# (e.g. a restart) and are reported as failed
+EXPORT_TIMEOUT = int(os.getenv("BOQ_EXPORT_TIMEOUT", "3600"))
+
+EXPORT_COLUMNS = [
+    ("Page", Page.page_number),
+    ("Tag", HVACComponent.tag),
+    ("Name", HVACComponent.name),
+    ("Category", HVACComponent.category),
+    ("Class", HVACComponent.class_name),
+    ("Quantity", HVACComponent.quantity),
+    ("Neck Size", HVACComponent.neck_size),
+    ("Face Size", HVACComponent.face_size),
+    ("Inlet Size", HVACComponent.inlet_size),
+    ("CFM", HVACComponent.cfm),
+    ("Orientation", HVACComponent.orientation),
+    ("Material", Material.name),
+    ("Manufacturer", Manufacturer.name),
+    ("Model", Model.model_number),
+    ("Unit Cost", HVACComponent.unit_cost),
+    ("Total Cost", HVACComponent.total_cost),
+    ("BOQ Code", HVACComponent.boq_code),
+    ("Section", HVACComponent.section),
+    ("Specification Note", HVACComponent.specification_note),
+    ("Confidence", Detection.confidence),
+    ("Detection ID", Detection.id),
+]
+
+
+def _export_query(project_id: str):
+    return (
+        select(*[column for _, column in EXPORT_COLUMNS])
+        .select_from(HVACComponent)
+        .join(Detection, Detection.id == HVACComponent.detection_id)
+        .outerjoin(Page, Page.id == Detection.page_id)
+        .outerjoin(Material, Material.id == HVACComponent.material_id)
+        .outerjoin(Manufacturer, Manufacturer.id == HVACComponent.manufacturer_id)
+        .outerjoin(Model, Model.id == HVACComponent.model_id)
+        .where(HVACComponent.project_id == project_id)
+        .order_by(
+            HVACComponent.section,
+            HVACComponent.boq_code,
+            HVACComponent.class_name,
+            Page.page_number,
+            HVACComponent.id,
+        )
+    )
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        # BOM so Excel opens the CSV as UTF-8
+        self._file = open(path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file)
+
+    def write(self, row: List):
+        self._writer.writerow(["" if value is None else value for value in row])
+
+    def close(self):
+        self._file.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path: str):
+        import xlsxwriter
+
+        # constant_memory flushes each row to disk once the next one starts
+        self._workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self._sheet = self._workbook.add_worksheet("BOQ")
+        self._row = 0
+
+    def write(self, row: List):
+        values = [float(v) if isinstance(v, Decimal) else v for v in row]
+        self._sheet.write_row(self._row, 0, values)
+        self._row += 1
+
+    def close(self):
+        self._workbook.close()
+
+
+def _open_writer(fmt: str, path: str):
+    return _XlsxWriter(path) if fmt == "xlsx" else _CsvWriter(path)
+
+
+def run_export(export_id: str) -> None:
+    """
+    Generate an export file. Runs as a background task with its own
+    sessions: one streams rows, the other records progress (committing on
+    the streaming session would close its server-side cursor).
+    """
+    status_db = SessionLocal()
+    stream_db = SessionLocal()
+    path = None
+    try:
+        export = status_db.query(BoqExport).filter(BoqExport.id == export_id).first()
+        # Already expired as stale (see BoqExportService._expire_stale)
+        if not export or export.status != "pending":
+            return
+
+        export.status = "running"
+        export.total_rows = (
+            status_db.query(func.count(HVACComponent.id))
+            .filter(HVACComponent.project_id == export.project_id)
+            .scalar()
+        )
+        status_db.commit()
+
+        fd, path = tempfile.mkstemp(suffix=f".{export.format}", dir=UPLOAD_SPOOL_DIR)
+        os.close(fd)
+
+        writer = _open_writer(export.format, path)
+        written = 0
+        try:
+            writer.write([header for header, _ in EXPORT_COLUMNS])
+            rows = stream_db.execute(
+                _export_query(export.project_id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            for row in rows:
+                writer.write(list(row))
+                written += 1
+                if written % EXPORT_PROGRESS_EVERY == 0:
+                    export.progress = written
+                    status_db.commit()
+        finally:
+            writer.close()
+            stream_db.rollback()
+
+        upload = CloudinaryService.upload_raw(
+            path,
+            f"exports/{export.project_id}/boq_{export.id}.{export.format}",
+        )
+
+        export.progress = written
+        export.file_url = upload["url"]
+        export.status = "completed"
+        export.completed_at = datetime.utcnow()
+        status_db.commit()
+        logger.info("BOQ export %s finished: %d rows", export_id, written)
+    except Exception as e:
+        logger.exception("BOQ export %s failed", export_id)
+        status_db.rollback()
+        export = status_db.query(BoqExport).filter(BoqExport.id == export_id).first()
+        if export:
+            export.status = "failed"
+            export.error = f"{type(e).__name__}: {e}"
+            status_db.commit()
+    finally:
+        if path:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        stream_db.close()
+        status_db.close()
+
+
+class BoqExportService(BaseService):
+    """Creates and reports on BOQ export jobs"""
+
+    def create_export(self, project_id: str, user_id: str, fmt: str) -> BoqExport:
+        fmt = (fmt or "").lower()
+        if fmt not in EXPORT_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported export format. Must be one of: {list(EXPORT_FORMATS)}"
+            )
+        if not self.db.query(Project.id).filter(Project.id == project_id).first():
+            raise HTTPException(status_code=404, detail="Project not found")
+        if not self.db.query(User.id).filter(User.id == user_id).first():
+            raise HTTPException(status_code=404, detail="User not found")
+
+        export = BoqExport(
+            id=str(uuid.uuid4()),
+            project_id=project_id,
+            user_id=user_id,
+            format=fmt,
+            status="pending",
+            progress=0,
+        )
+        self.db.add(export)
+        self.db.commit()
+        self.db.refresh(export)
+        return export
+
+    def _expire_stale(self, exports: List[BoqExport]) -> None:
+        """Mark jobs whose worker died (still pending/running past EXPORT_TIMEOUT) as failed"""
+        cutoff = datetime.utcnow() - timedelta(seconds=EXPORT_TIMEOUT)
+        stale = [
+            export for export in exports
+            if export.status in ("pending", "running")
+            and export.created_at and export.created_at < cutoff
+        ]
+        for export in stale:
+            export.status = "failed"
+            export.error = "Export did not finish; the worker may have restarted. Please retry."
+        if stale:
+            self.db.commit()
+
+    def get_export(self, export_id: str) -> Optional[BoqExport]:
+        export = self.db.query(BoqExport).filter(BoqExport.id == export_id).first()
+        if export:
+            self._expire_stale([export])
+        return export
+
+    def get_project_exports(self, project_id: str) -> List[BoqExport]:
+        exports = (
+            self.db.query(BoqExport)
+            .filter(BoqExport.project_id == project_id)
+            .order_by(BoqExport.created_at.desc())
+            .all()
+        )
+        self._expire_stale(exports)
+        return exports
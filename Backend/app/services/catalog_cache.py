@@ -0,0 +1,86 @@
+"""
+HVAC Catalog Cache
+
+Materials, manufacturers and models change rarely but are read every
+time a properties panel dropdown opens. Serialized catalog payloads are
+kept in process memory with a TTL and a version number; any catalog
+write bumps the version, which drops every entry at once.
+
+Each entry carries an ETag derived from its content, so it is identical
+across workers and clients can revalidate with If-None-Match. A write in
+one worker reaches other workers' caches within CATALOG_CACHE_TTL.
+
+Some keys contain client-supplied ids, so the cache is bounded: expired
+entries are dropped on insert and the least recently used entry goes once
+CATALOG_CACHE_MAX_ENTRIES is reached.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "1024"))
+
+
+class CatalogCache:
+    """Versioned read-through cache of JSON-ready payloads"""
+
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL, max_entries: int = CATALOG_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.version = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, Any, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_etag(payload: Any) -> str:
+        digest = hashlib.sha1(
+            json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    def get(self, key: str, loader: Callable[[], Any], cache_empty: bool = True) -> Tuple[Any, str]:
+        """
+        Return (payload, etag) for `key`, calling `loader` on a miss.
+
+        The loader must return JSON-serializable data (not ORM objects).
+        With cache_empty=False, empty results (None, []) are not stored, so
+        lookups of unknown ids do not fill the cache.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now and entry[1] == self.version:
+                self._entries.move_to_end(key)
+                return entry[2], entry[3]
+            version = self.version
+
+        payload = loader()
+        etag = self.make_etag(payload)
+
+        # Don't store a result that an invalidation raced past
+        if cache_empty or payload:
+            with self._lock:
+                if version == self.version:
+                    self._store(key, (now + self.ttl, version, payload, etag), now)
+        return payload, etag
+
+    def _store(self, key: str, entry: Tuple, now: float) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        for stale_key in [k for k, e in self._entries.items() if e[0] <= now]:
+            del self._entries[stale_key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+
+catalog_cache = CatalogCache()
@@ -12,6 +12,9 @@ cloudinary.config(
     api_secret=os.getenv("CLOUDINARY_API_SECRET")
 )
 
+# Incoming quality for page images ("auto" lets Cloudinary choose)
+IMAGE_QUALITY = os.getenv("CLOUDINARY_IMAGE_QUALITY", "100")
+
 class CloudinaryService:
     @staticmethod
     def upload_pdf(file_content, filename: str):
@@ -31,6 +34,23 @@ class CloudinaryService:
         except Exception as e:
             raise Exception(f"Failed to upload PDF to Cloudinary: {str(e)}")
 
+    @staticmethod
+    def upload_raw(file_content, public_id: str):
+        """Upload a non-image file (exports, manifests) under an exact public id"""
+        try:
+            result = cloudinary.uploader.upload(
+                file_content,
+                resource_type="raw",
+                public_id=public_id,
+            )
+            return {
+                "url": result["secure_url"],
+                "public_id": result["public_id"],
+                "file_size": result.get("bytes", 0)
+            }
+        except Exception as e:
+            raise Exception(f"Failed to upload file to Cloudinary: {str(e)}")
+
     @staticmethod
     def upload_image(file_content, filename: str):
         """Upload image to Cloudinary"""
@@ -40,7 +60,7 @@ class CloudinaryService:
                 public_id=f"images/{filename}",
                 transformation=[
                     {"width": 6000, "height": 5500, "crop": "limit"},
-                    {"quality": 100 }
+                    {"quality": int(IMAGE_QUALITY) if IMAGE_QUALITY.isdigit() else IMAGE_QUALITY}
                 ]
             )
             return {
@@ -51,6 +71,23 @@ class CloudinaryService:
         except Exception as e:
             raise Exception(f"Failed to upload image to Cloudinary: {str(e)}")
 
+    @staticmethod
+    def upload_raster(file_content, public_id: str):
+        """Upload an already-encoded image as-is (no incoming transformation)"""
+        try:
+            result = cloudinary.uploader.upload(
+                file_content,
+                public_id=public_id,
+                overwrite=False,
+            )
+            return {
+                "url": result["secure_url"],
+                "public_id": result["public_id"],
+                "file_size": result.get("bytes", 0)
+            }
+        except Exception as e:
+            raise Exception(f"Failed to upload image to Cloudinary: {str(e)}")
+
     @staticmethod
     def delete_file(public_id: str, resource_type="image"):
         """Delete file from Cloudinary"""
@@ -0,0 +1,136 @@
+"""
+Compact Detection Payloads
+
+Bounding boxes normally go out as one JSON object per box, repeating
+every key. For pages with thousands of boxes two denser encodings can be
+negotiated with `?format=` or the Accept header:
+
+columnar (application/vnd.hvac.boxes+json)
+    {"count": n, "classes": [...], "id": [...], "x1": [...], "y1": [...],
+     "x2": [...], "y2": [...], "class": [class index...], "confidence": [...],
+     "is_manual": [0|1...], "is_edited": [0|1...]}
+
+binary (application/vnd.hvac.boxes), little-endian:
+    offset 0   magic   b"HVB1"
+           4   uint32  box count n
+           8   uint32  metadata length m
+          12   m bytes metadata JSON {"classes": [...], "ids": [...], ...},
+               zero-padded to a multiple of 4
+               float32[n] x1, y1, x2, y2, confidence (one column each)
+               uint16[n]  class index
+               uint8[n]   flags (bit 0 is_manual, bit 1 is_edited)
+
+Both carry the editor's box fields only; notes stay in the JSON form.
+"""
+import struct
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import orjson
+from fastapi import HTTPException
+
+from app.models.detections import Detection
+
+FORMATS = ("json", "columnar", "binary")
+COLUMNAR_MEDIA_TYPE = "application/vnd.hvac.boxes+json"
+BINARY_MEDIA_TYPE = "application/vnd.hvac.boxes"
+BINARY_MAGIC = b"HVB1"
+
+# Editor bounding box fields, and the detection columns that produce them
+BOX_KEYS = ("id", "x1", "y1", "x2", "y2", "label", "confidence", "is_manual", "is_edited")
+BOX_COLUMNS = (
+    Detection.id,
+    Detection.bbox_x1,
+    Detection.bbox_y1,
+    Detection.bbox_x2,
+    Detection.bbox_y2,
+    Detection.class_name,
+    Detection.confidence,
+    Detection.is_manual,
+    Detection.is_edited,
+)
+
+
+def negotiate_format(accept: Optional[str], requested: Optional[str], allowed: Sequence[str] = FORMATS) -> str:
+    """
+    Pick the payload format: an explicit `format` parameter wins, then the
+    Accept header; anything else gets plain JSON.
+    """
+    if requested:
+        requested = requested.lower()
+        if requested not in allowed:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported format. Must be one of: {list(allowed)}"
+            )
+        return requested
+
+    media_types = {part.split(";")[0].strip().lower() for part in (accept or "").split(",")}
+    if BINARY_MEDIA_TYPE in media_types and "binary" in allowed:
+        return "binary"
+    if COLUMNAR_MEDIA_TYPE in media_types and "columnar" in allowed:
+        return "columnar"
+    return "json"
+
+
+def boxes_to_dicts(rows: Sequence[tuple]) -> list:
+    """Rows in BOX_KEYS order as the classic one-object-per-box payload"""
+    return [dict(zip(BOX_KEYS, row)) for row in rows]
+
+
+def _columns(rows: Sequence[tuple]):
+    if not rows:
+        return ((),) * len(BOX_KEYS)
+    return tuple(zip(*rows))
+
+
+def encode_columnar(rows: Sequence[tuple], class_index: Optional[Dict[str, int]] = None) -> Dict:
+    """
+    Rows in BOX_KEYS order as parallel arrays.
+
+    Pass a shared `class_index` to encode several pages against one class
+    table (the caller then publishes `list(class_index)`); otherwise the
+    table is included as "classes".
+    """
+    own_index = class_index is None
+    if own_index:
+        class_index = {}
+
+    ids, x1, y1, x2, y2, labels, confidence, manual, edited = _columns(rows)
+    payload = {
+        "count": len(rows),
+        "id": list(ids),
+        "x1": list(x1),
+        "y1": list(y1),
+        "x2": list(x2),
+        "y2": list(y2),
+        "class": [class_index.setdefault(label, len(class_index)) for label in labels],
+        "confidence": list(confidence),
+        "is_manual": [1 if value else 0 for value in manual],
+        "is_edited": [1 if value else 0 for value in edited],
+    }
+    if own_index:
+        payload["classes"] = list(class_index)
+    return payload
+
+
+def encode_binary(rows: Sequence[tuple], meta: Optional[Dict] = None) -> bytes:
+    """Rows in BOX_KEYS order as the packed binary layout described above"""
+    class_index: Dict[str, int] = {}
+    ids, x1, y1, x2, y2, labels, confidence, manual, edited = _columns(rows)
+    classes = [class_index.setdefault(label, len(class_index)) for label in labels]
+
+    header = orjson.dumps({**(meta or {}), "classes": list(class_index), "ids": list(ids)})
+    count = len(rows)
+
+    return b"".join((
+        struct.pack("<4sII", BINARY_MAGIC, count, len(header)),
+        header,
+        b"\0" * (-len(header) % 4),
+        np.array([x1, y1, x2, y2, confidence], dtype="<f4").reshape(5, count).tobytes(),
+        np.array(classes, dtype="<u2").tobytes(),
+        np.array(
+            [(1 if m else 0) | (2 if e else 0) for m, e in zip(manual, edited)],
+            dtype=np.uint8,
+        ).tobytes(),
+    ))
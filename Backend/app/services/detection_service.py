@@ -1,13 +1,27 @@
 import uuid
 from typing import Dict, List, Any
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.models.detections import Detection
 from app.models.pages import Page
 from app.services.base import BaseService
+from app.services.page_asset_service import PageAssetService, detection_cache_key
+from app.services.image_probe import LazyImage
+from app.services import revision_diff_service as revisions
+from app.services.detection_encoding import BOX_COLUMNS
+from app.services.hvac_component_service import HVACComponentService, AUTO_MATERIALIZE_COMPONENTS
 import requests
-from PIL import Image
-from io import BytesIO
+
+# Fields of DetectionResponse, selected as columns for the fast read path
+DETECTION_COLUMNS = (
+    Detection.id, Detection.project_id, Detection.page_id, Detection.class_name,
+    Detection.confidence, Detection.bbox_x1, Detection.bbox_y1, Detection.bbox_x2,
+    Detection.bbox_y2, Detection.notes, Detection.is_manual, Detection.is_edited,
+    Detection.created_at,
+)
+DETECTION_KEYS = tuple(column.key for column in DETECTION_COLUMNS)
+
 
 class DetectionService(BaseService):
     @staticmethod
@@ -38,6 +52,26 @@ class DetectionService(BaseService):
             .all()
         )
 
+    def get_detection_rows_by_page(self, page_id: str) -> List[Dict]:
+        """
+        A page's detections as plain dicts built from row tuples - no ORM
+        objects, no per-row schema validation.
+        """
+        rows = (
+            self.db.query(*DETECTION_COLUMNS)
+            .filter(Detection.page_id == page_id)
+            .all()
+        )
+        return [dict(zip(DETECTION_KEYS, row)) for row in rows]
+
+    def get_box_rows_by_page(self, page_id: str) -> List[tuple]:
+        """A page's boxes as tuples in BOX_KEYS order, for the compact encodings"""
+        return (
+            self.db.query(*BOX_COLUMNS)
+            .filter(Detection.page_id == page_id)
+            .all()
+        )
+
     def create_detection(self, data: Dict):
         # Verify page exists
         self._get_page(data["page_id"])
@@ -104,32 +138,87 @@ class DetectionService(BaseService):
         ).delete(synchronize_session='fetch')
         self.db.commit()
         
-        # Download the image from Cloudinary
-        try:
-            response = requests.get(page.image_url)
-            response.raise_for_status()
-            image = Image.open(BytesIO(response.content))
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to load image: {str(e)}")
-        
         # Import PDFService to use its detection methods
         from app.services.pdf_service import PDFService
         pdf_service = PDFService(self.db)
-        
-        # Run detection - choose method based on use_tiling parameter
-        if use_tiling:
-            bounding_boxes = pdf_service.generate_detections_tiled(page_id, page.project_id, image)
-        else:
-            bounding_boxes = pdf_service.generate_detections(page_id, page.project_id, image)
+        assets = PageAssetService(self.db)
+        cache_key = detection_cache_key(use_tiling)
+
+        def _detect():
+            # Identical raster already processed by this model: reuse its result
+            cached = assets.get_cached_detections(page.content_hash, cache_key)
+            if cached is not None:
+                return pdf_service.save_detections(page_id, page.project_id, cached), True, None
+
+            # Download the image from Cloudinary
+            try:
+                response = requests.get(page.image_url)
+                response.raise_for_status()
+                # Pixels are decoded only when inference needs them
+                image = LazyImage(response.content)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Failed to load image: {str(e)}")
+
+            fingerprint = revisions.compute_fingerprint(image) if use_tiling else None
+
+            # Revised sheet: only re-detect the tiles that differ from the
+            # previous revision and carry its detections over elsewhere
+            plan = None
+            if fingerprint is not None and page.previous_content_hash:
+                previous_asset = assets.get_page_asset(page.previous_content_hash)
+                plan = revisions.plan_incremental(previous_asset, image, fingerprint, cache_key)
+
+            if plan is None:
+                # Run detection - choose method based on use_tiling parameter
+                detections = pdf_service.infer_detections(page_id, page.project_id, image, use_tiling=use_tiling)
+                incremental = None
+            else:
+                fresh = []
+                if plan["changed"]:
+                    fresh = pdf_service.infer_detections(
+                        page_id,
+                        page.project_id,
+                        image,
+                        use_tiling=True,
+                        tile_ids=[bound['tile_id'] for bound in plan["changed"]],
+                    )
+                detections = revisions.merge_revision(
+                    previous_asset.detections, fresh, plan["changed"], plan["tiler"]
+                )
+                incremental = {
+                    "changed_tiles": len(plan["changed"]),
+                    "total_tiles": len(plan["bounds"]),
+                }
+
+            assets.store_detections(
+                page.content_hash,
+                cache_key,
+                detections,
+                fingerprint=revisions.pack_fingerprint(fingerprint) if fingerprint is not None else None,
+            )
+            return pdf_service.save_detections(page_id, page.project_id, detections), False, incremental
+
+        # Download and inference block, so keep them off the event loop
+        bounding_boxes, cached, incremental = await run_in_threadpool(_detect)
         
         # Commit the detections
         self.db.commit()
-        
+
+        # Every detection from this run gets its default component in one bulk insert
+        components_created = 0
+        if AUTO_MATERIALIZE_COMPONENTS:
+            components_created = HVACComponentService(self.db).materialize_components(
+                page_id, [box["id"] for box in bounding_boxes]
+            )
+
         return {
             "message": "Detection completed",
             "page_id": page_id,
             "detections_count": len(bounding_boxes),
             "method": "tiled" if use_tiling else "full_image",
+            "cached": cached,
+            "incremental": incremental,
+            "components_created": components_created,
             "detections": bounding_boxes
         }
 
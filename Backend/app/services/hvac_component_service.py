@@ -1,8 +1,15 @@
+import os
 import uuid
-from typing import List, Optional, Dict, Any
+import json
+import base64
+from decimal import Decimal
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
 from fastapi import HTTPException
+from sqlalchemy import tuple_, update, select, bindparam, any_
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 
 from app.models.hvac_components import (
     HVACComponent,
@@ -11,7 +18,99 @@ from app.models.hvac_components import (
     Model,
     OrientationEnum
 )
+from app.models.detections import Detection
+from app.models.pages import Page
+from app.models.projects import Project
+from app.models.users import User
 from app.services.base import BaseService
+from app.services.catalog_cache import catalog_cache
+from constants.classes import class_info
+
+# Create default components for new AI detections when a detection run finishes
+AUTO_MATERIALIZE_COMPONENTS = os.getenv("AUTO_MATERIALIZE_COMPONENTS", "true").lower() in ("1", "true", "yes")
+
+
+# Scalar columns a client may request as a sparse fieldset
+COMPONENT_FIELDS = {
+    "id", "project_id", "detection_id", "created_by",
+    "name", "category", "class_name", "quantity",
+    "neck_size", "face_size", "inlet_size",
+    "cfm", "orientation", "tag",
+    "material_id", "manufacturer_id", "model_id",
+    "unit_cost", "total_cost", "boq_code", "section", "specification_note",
+    "created_at", "updated_at",
+}
+
+
+def _encode_cursor(created_at: datetime, component_id: str) -> str:
+    raw = json.dumps([created_at.isoformat() if created_at else None, component_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, component_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), component_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Columns of the combined page payload, in select order
+PAGE_DETECTION_COLUMNS = [
+    Detection.id, Detection.class_name, Detection.confidence,
+    Detection.bbox_x1, Detection.bbox_y1, Detection.bbox_x2, Detection.bbox_y2,
+    Detection.notes, Detection.is_manual, Detection.is_edited, Detection.created_at,
+]
+PAGE_COMPONENT_COLUMNS = [
+    HVACComponent.id, HVACComponent.name, HVACComponent.category, HVACComponent.quantity,
+    HVACComponent.neck_size, HVACComponent.face_size, HVACComponent.inlet_size,
+    HVACComponent.cfm, HVACComponent.orientation, HVACComponent.tag,
+    HVACComponent.material_id, HVACComponent.manufacturer_id, HVACComponent.model_id,
+    HVACComponent.unit_cost, HVACComponent.total_cost, HVACComponent.boq_code,
+    HVACComponent.section, HVACComponent.specification_note, HVACComponent.updated_at,
+]
+PAGE_CATALOG_COLUMNS = [
+    Material.name.label("material_name"),
+    Manufacturer.name.label("manufacturer_name"),
+    Model.model_number.label("model_number"),
+]
+
+
+# Foreign keys of a component, checked up front by bulk_create_components
+COMPONENT_REFERENCES = {
+    "project_id": (Project, "Project"),
+    "material_id": (Material, "Material"),
+    "manufacturer_id": (Manufacturer, "Manufacturer"),
+    "model_id": (Model, "Model"),
+    "created_by": (User, "User"),
+}
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _plain(value: Any) -> Any:
+    # orjson has no Decimal support; costs go out as numbers
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _material_dict(material: Material) -> Dict[str, Any]:
+    return {"id": material.id, "name": material.name, "created_at": _iso(material.created_at)}
+
+
+def _manufacturer_dict(manufacturer: Manufacturer) -> Dict[str, Any]:
+    return {"id": manufacturer.id, "name": manufacturer.name, "created_at": _iso(manufacturer.created_at)}
+
+
+def _model_dict(model: Model, manufacturer: Optional[Manufacturer] = None) -> Dict[str, Any]:
+    return {
+        "id": model.id,
+        "manufacturer_id": model.manufacturer_id,
+        "model_number": model.model_number,
+        "created_at": _iso(model.created_at),
+        "manufacturer": _manufacturer_dict(manufacturer) if manufacturer else None,
+    }
 
 
 class HVACComponentService(BaseService):
@@ -47,6 +146,111 @@ class HVACComponentService(BaseService):
             .all()
         )
 
+    def query_project_components(
+        self,
+        project_id: str,
+        tag: str = None,
+        category: str = None,
+        class_name: str = None,
+        section: str = None,
+        limit: int = None,
+        cursor: str = None,
+        fields: List[str] = None,
+    ) -> Tuple[list, Optional[str]]:
+        """
+        Filter, sort and page a project's components in SQL.
+
+        Rows are ordered by (created_at, id) and paged by keyset: pass the
+        returned cursor back to continue after the last row. With `fields`,
+        only those columns are selected and plain dicts are returned.
+
+        Returns:
+            (components, next_cursor) - next_cursor is None on the last page
+        """
+        if fields:
+            unknown = [f for f in fields if f not in COMPONENT_FIELDS]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {unknown}")
+            # Keyset columns are always selected; dropped from the output below
+            columns = list(dict.fromkeys([*fields, "created_at", "id"]))
+            query = self.db.query(*[getattr(HVACComponent, c) for c in columns])
+        else:
+            query = self.db.query(HVACComponent).options(
+                joinedload(HVACComponent.material),
+                joinedload(HVACComponent.manufacturer),
+                joinedload(HVACComponent.model)
+            )
+
+        query = query.filter(HVACComponent.project_id == project_id)
+        if tag:
+            escaped = tag.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            # Served by the trigram index on tag
+            query = query.filter(HVACComponent.tag.ilike(f"%{escaped}%", escape="\\"))
+        if category:
+            query = query.filter(HVACComponent.category == category)
+        if class_name:
+            query = query.filter(HVACComponent.class_name == class_name)
+        if section:
+            query = query.filter(HVACComponent.section == section)
+
+        if cursor:
+            after_created, after_id = _decode_cursor(cursor)
+            query = query.filter(
+                tuple_(HVACComponent.created_at, HVACComponent.id) > tuple_(after_created, after_id)
+            )
+
+        query = query.order_by(HVACComponent.created_at, HVACComponent.id)
+        if limit:
+            query = query.limit(limit + 1)
+
+        rows = query.all()
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+        if fields:
+            rows = [{f: _plain(getattr(row, f)) for f in fields} for row in rows]
+        return rows, next_cursor
+
+    def get_page_detections_with_components(self, page_id: str) -> List[Dict[str, Any]]:
+        """
+        Every detection of a page with its component (or None) in one query.
+
+        Detections are LEFT JOINed to components and the catalog names, and
+        rows are turned into dicts straight from the result tuples.
+        """
+        if not self.db.query(Page.id).filter(Page.id == page_id).first():
+            raise HTTPException(status_code=404, detail="Page not found")
+
+        rows = (
+            self.db.query(*PAGE_DETECTION_COLUMNS, *PAGE_COMPONENT_COLUMNS, *PAGE_CATALOG_COLUMNS)
+            .select_from(Detection)
+            .outerjoin(HVACComponent, HVACComponent.detection_id == Detection.id)
+            .outerjoin(Material, Material.id == HVACComponent.material_id)
+            .outerjoin(Manufacturer, Manufacturer.id == HVACComponent.manufacturer_id)
+            .outerjoin(Model, Model.id == HVACComponent.model_id)
+            .filter(Detection.page_id == page_id)
+            .order_by(Detection.created_at, Detection.id)
+            .all()
+        )
+
+        detection_keys = [c.key for c in PAGE_DETECTION_COLUMNS]
+        component_keys = [c.key for c in PAGE_COMPONENT_COLUMNS] + [c.key for c in PAGE_CATALOG_COLUMNS]
+        split = len(detection_keys)
+
+        payload = []
+        for row in rows:
+            detection = dict(zip(detection_keys, row[:split]))
+            component_values = row[split:]
+            # Component id is NULL when the detection has no component yet
+            detection["component"] = (
+                {key: _plain(value) for key, value in zip(component_keys, component_values)}
+                if component_values[0] is not None else None
+            )
+            payload.append(detection)
+        return payload
+
     def get_component_by_detection(self, detection_id: str) -> Optional[HVACComponent]:
         """Get HVAC component by detection ID"""
         return (
@@ -116,6 +320,71 @@ class HVACComponentService(BaseService):
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
 
+    def bulk_update_components(
+        self,
+        updates: Dict[str, Any],
+        ids: Optional[List[str]] = None,
+        project_id: Optional[str] = None,
+        page_id: Optional[str] = None,
+        class_name: Optional[str] = None,
+    ) -> int:
+        """
+        Apply one patch to many components in a single UPDATE.
+
+        Targets are the components matching every criterion given: `ids`
+        (when given) AND each filter, so filters narrow an id list rather
+        than add to it. Without ids, a project or page filter is required.
+        Like update_component, None values in the patch are ignored.
+
+        Returns:
+            Number of components updated
+        """
+        values = {
+            key: value for key, value in updates.items()
+            if value is not None and hasattr(HVACComponent, key)
+        }
+        if not values:
+            raise HTTPException(status_code=400, detail="No fields to update")
+        if ids is None and not (project_id or page_id):
+            raise HTTPException(
+                status_code=400,
+                detail="Provide component ids or a project_id/page_id filter"
+            )
+        if ids is not None and not ids:
+            raise HTTPException(
+                status_code=400,
+                detail="ids must not be empty; omit it to update by filter"
+            )
+
+        if "orientation" in values:
+            try:
+                OrientationEnum(values["orientation"])
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid orientation. Must be one of: {[e.value for e in OrientationEnum]}"
+                )
+
+        stmt = update(HVACComponent).values(**values)
+        if ids is not None:
+            stmt = stmt.where(HVACComponent.id == any_(bindparam("ids", ids, type_=ARRAY(HVACComponent.id.type))))
+        if project_id:
+            stmt = stmt.where(HVACComponent.project_id == project_id)
+        if page_id:
+            stmt = stmt.where(HVACComponent.detection_id.in_(
+                select(Detection.id).where(Detection.page_id == page_id)
+            ))
+        if class_name:
+            stmt = stmt.where(HVACComponent.class_name == class_name)
+
+        try:
+            result = self.db.execute(stmt.execution_options(synchronize_session=False))
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+        return result.rowcount
+
     def delete_component(self, component_id: str) -> bool:
         """Delete an HVAC component"""
         component = self.get_component_by_id(component_id)
@@ -144,6 +413,7 @@ class HVACComponentService(BaseService):
             material = Material(id=uuid.uuid4(), name=name)
             self.db.add(material)
             self.db.commit()
+            catalog_cache.invalidate()
             self.db.refresh(material)
             return material
         except IntegrityError:
@@ -159,6 +429,7 @@ class HVACComponentService(BaseService):
         try:
             material.name = name
             self.db.commit()
+            catalog_cache.invalidate()
             self.db.refresh(material)
             return material
         except IntegrityError:
@@ -173,6 +444,7 @@ class HVACComponentService(BaseService):
 
         self.db.delete(material)
         self.db.commit()
+        catalog_cache.invalidate()
         return True
 
     # =====================
@@ -193,6 +465,7 @@ class HVACComponentService(BaseService):
             manufacturer = Manufacturer(id=uuid.uuid4(), name=name)
             self.db.add(manufacturer)
             self.db.commit()
+            catalog_cache.invalidate()
             self.db.refresh(manufacturer)
             return manufacturer
         except IntegrityError:
@@ -208,6 +481,7 @@ class HVACComponentService(BaseService):
         try:
             manufacturer.name = name
             self.db.commit()
+            catalog_cache.invalidate()
             self.db.refresh(manufacturer)
             return manufacturer
         except IntegrityError:
@@ -222,6 +496,7 @@ class HVACComponentService(BaseService):
 
         self.db.delete(manufacturer)
         self.db.commit()
+        catalog_cache.invalidate()
         return True
 
     # =====================
@@ -261,6 +536,7 @@ class HVACComponentService(BaseService):
             )
             self.db.add(model)
             self.db.commit()
+            catalog_cache.invalidate()
             self.db.refresh(model)
             return model
         except IntegrityError:
@@ -288,6 +564,7 @@ class HVACComponentService(BaseService):
                 model.model_number = model_number
 
             self.db.commit()
+            catalog_cache.invalidate()
             self.db.refresh(model)
             return model
         except IntegrityError:
@@ -305,33 +582,223 @@ class HVACComponentService(BaseService):
 
         self.db.delete(model)
         self.db.commit()
+        catalog_cache.invalidate()
         return True
 
+    # =====================
+    # CATALOG (CACHED)
+    # =====================
+
+    def catalog_materials(self):
+        """(materials payload, etag) served from the catalog cache"""
+        return catalog_cache.get(
+            "materials",
+            lambda: [_material_dict(m) for m in self.get_all_materials()]
+        )
+
+    def catalog_manufacturers(self):
+        return catalog_cache.get(
+            "manufacturers",
+            lambda: [_manufacturer_dict(m) for m in self.get_all_manufacturers()]
+        )
+
+    def catalog_models(self, manufacturer_id: str):
+        return catalog_cache.get(
+            f"models:{manufacturer_id}",
+            lambda: [_model_dict(m) for m in self.get_models_by_manufacturer(manufacturer_id)],
+            cache_empty=False,
+        )
+
+    def catalog_model(self, model_id: str):
+        """(model payload or None, etag)"""
+        def load():
+            model = self.get_model_by_id(model_id)
+            return _model_dict(model, model.manufacturer) if model else None
+
+        return catalog_cache.get(f"model:{model_id}", load, cache_empty=False)
+
+    def catalog_tree(self):
+        """Whole catalog - materials and manufacturers with their models - in three queries"""
+        def load():
+            models_by_manufacturer: Dict[str, list] = {}
+            for model in self.db.query(Model).order_by(Model.model_number):
+                models_by_manufacturer.setdefault(model.manufacturer_id, []).append(_model_dict(model))
+
+            return {
+                "materials": [_material_dict(m) for m in self.get_all_materials()],
+                "manufacturers": [
+                    {**_manufacturer_dict(m), "models": models_by_manufacturer.get(m.id, [])}
+                    for m in self.get_all_manufacturers()
+                ],
+            }
+
+        return catalog_cache.get("tree", load)
+
     # =====================
     # BULK OPERATIONS
     # =====================
 
     def bulk_create_components(self, components_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Bulk create HVAC components"""
+        """
+        Bulk create HVAC components with set-based queries.
+
+        Existing components, detections and every referenced row (project,
+        material, manufacturer, model, user) are prefetched in one query per
+        table and items are validated in memory, so one bad reference only
+        fails its own item. All valid rows then go in a single
+        INSERT ... ON CONFLICT (detection_id) DO NOTHING RETURNING.
+        Invalid items and lost conflicts are reported in `failed`.
+        """
         created = []
         failed = []
-
+        if not components_data:
+            return {"created": created, "failed": failed}
+
+        detection_ids = {data.get("detection_id") for data in components_data}
+        taken = {
+            detection_id for (detection_id,) in
+            self.db.query(HVACComponent.detection_id)
+            .filter(HVACComponent.detection_id.in_(detection_ids))
+        }
+        detection_projects = dict(
+            self.db.query(Detection.id, Detection.project_id)
+            .filter(Detection.id.in_(detection_ids))
+        )
+        existing = {}
+        for field, (model, _) in COMPONENT_REFERENCES.items():
+            ids = {data.get(field) for data in components_data} - {None}
+            existing[field] = {
+                ref_id for (ref_id,) in
+                self.db.query(model.id).filter(model.id.in_(ids))
+            } if ids else set()
+        orientations = {e.value for e in OrientationEnum}
+
+        rows = []
+        pending = {}
         for data in components_data:
-            try:
-                component = self.create_component(data)
-                created.append(component)
-            except HTTPException as e:
-                failed.append({
-                    "data": data,
-                    "error": e.detail
-                })
-            except Exception as e:
+            detection_id = data.get("detection_id")
+            missing = next(
+                (
+                    (field, label) for field, (_, label) in COMPONENT_REFERENCES.items()
+                    if data.get(field) is not None and data[field] not in existing[field]
+                ),
+                None,
+            )
+            if detection_id in taken:
+                error = f"HVAC component already exists for detection {detection_id}"
+            elif detection_id in pending:
+                error = f"Duplicate detection {detection_id} in request"
+            elif detection_id not in detection_projects:
+                error = f"Detection {detection_id} not found"
+            elif data.get("orientation") is not None and data["orientation"] not in orientations:
+                error = f"Invalid orientation. Must be one of: {[e.value for e in OrientationEnum]}"
+            elif missing:
+                error = f"{missing[1]} {data[missing[0]]} not found"
+            elif detection_projects[detection_id] != data.get("project_id"):
+                error = f"Detection {detection_id} does not belong to project {data.get('project_id')}"
+            else:
+                pending[detection_id] = data
+                rows.append({"id": str(uuid.uuid4()), **data})
+                continue
+            failed.append({"data": data, "error": error})
+
+        if not rows:
+            return {"created": created, "failed": failed}
+
+        stmt = (
+            pg_insert(HVACComponent.__table__)
+            .on_conflict_do_nothing(index_elements=["detection_id"])
+            .returning(HVACComponent.id, HVACComponent.detection_id)
+        )
+        try:
+            inserted = self.db.execute(stmt, rows).all()
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+
+        # Rows inserted concurrently by another request lose the conflict
+        inserted_detections = {detection_id for _, detection_id in inserted}
+        for detection_id, data in pending.items():
+            if detection_id not in inserted_detections:
                 failed.append({
                     "data": data,
-                    "error": str(e)
+                    "error": f"HVAC component already exists for detection {detection_id}"
                 })
 
+        # One query loads the new rows with their relations for the response,
+        # returned in the order the items were submitted
+        if inserted:
+            loaded = {
+                component.id: component for component in
+                self.db.query(HVACComponent)
+                .options(
+                    joinedload(HVACComponent.material),
+                    joinedload(HVACComponent.manufacturer),
+                    joinedload(HVACComponent.model)
+                )
+                .filter(HVACComponent.id.in_([component_id for component_id, _ in inserted]))
+                .all()
+            }
+            created = [loaded[row["id"]] for row in rows if row["id"] in loaded]
+
         return {
             "created": created,
             "failed": failed
         }
+
+    def materialize_components(self, page_id: str, detection_ids: List[str]) -> int:
+        """
+        Create a default component for each of the given AI detections of a
+        page that has none yet (manual and older detections are left alone).
+
+        Name and category come from the detection class (HVAC_CLASS_INFO);
+        all rows go in one INSERT ... ON CONFLICT (detection_id) DO NOTHING,
+        so it is safe to run concurrently with client-side creation.
+
+        Args:
+            page_id: Page the detections belong to
+            detection_ids: Detections just inserted by a detection run
+
+        Returns:
+            Number of components created
+        """
+        if not detection_ids:
+            return 0
+
+        pending = (
+            self.db.query(Detection.id, Detection.project_id, Detection.class_name)
+            .outerjoin(HVACComponent, HVACComponent.detection_id == Detection.id)
+            .filter(
+                Detection.page_id == page_id,
+                Detection.id.in_(detection_ids),
+                Detection.is_manual.is_(False),
+                HVACComponent.id.is_(None),
+            )
+            .all()
+        )
+        if not pending:
+            return 0
+
+        rows = []
+        for detection_id, project_id, class_name in pending:
+            name, category = class_info(class_name)
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "project_id": project_id,
+                "detection_id": detection_id,
+                "name": name,
+                "category": category,
+                "class_name": class_name,
+                "quantity": 1,
+                "orientation": OrientationEnum.deg_0.value,
+            })
+
+        stmt = (
+            pg_insert(HVACComponent.__table__)
+            .on_conflict_do_nothing(index_elements=["detection_id"])
+            .returning(HVACComponent.id)
+        )
+        inserted = self.db.execute(stmt, rows).all()
+        self.db.commit()
+        return len(inserted)
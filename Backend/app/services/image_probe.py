@@ -0,0 +1,153 @@
+"""
+Image Header Probing
+
+Reads page dimensions from PNG / JPEG / WebP headers without decoding any
+pixels, and provides LazyImage, which carries those dimensions and only
+decodes the image the first time pixels are actually requested.
+"""
+import io
+import struct
+from typing import BinaryIO, Tuple, Union
+
+from PIL import Image, UnidentifiedImageError
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# JPEG start-of-frame markers (baseline, progressive, lossless, ...); not DHT/JPG/DAC
+_JPEG_SOF_MARKERS = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF,
+}
+
+
+def _read_exact(f: BinaryIO, n: int) -> bytes:
+    data = f.read(n)
+    if len(data) != n:
+        raise ValueError("Truncated image header")
+    return data
+
+
+def _probe_png(f: BinaryIO) -> Tuple[int, int]:
+    # Signature, then the IHDR chunk: length, type, width, height
+    header = _read_exact(f, 24)
+    if header[12:16] != b"IHDR":
+        raise ValueError("PNG without IHDR chunk")
+    return struct.unpack(">II", header[16:24])
+
+
+def _probe_jpeg(f: BinaryIO) -> Tuple[int, int]:
+    f.seek(2)
+    while True:
+        byte = _read_exact(f, 1)
+        if byte != b"\xff":
+            continue
+        marker = _read_exact(f, 1)[0]
+        while marker == 0xFF:  # fill bytes
+            marker = _read_exact(f, 1)[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue  # markers without a length field
+        length = struct.unpack(">H", _read_exact(f, 2))[0]
+        if marker in _JPEG_SOF_MARKERS:
+            _, height, width = struct.unpack(">BHH", _read_exact(f, 5))
+            return width, height
+        f.seek(length - 2, io.SEEK_CUR)
+
+
+def _probe_webp(f: BinaryIO) -> Tuple[int, int]:
+    f.seek(12)
+    chunk = _read_exact(f, 4)
+    _read_exact(f, 4)  # chunk size
+    if chunk == b"VP8X":
+        data = _read_exact(f, 10)
+        width = int.from_bytes(data[4:7], "little") + 1
+        height = int.from_bytes(data[7:10], "little") + 1
+        return width, height
+    if chunk == b"VP8L":
+        data = _read_exact(f, 5)
+        bits = int.from_bytes(data[1:5], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 ":
+        data = _read_exact(f, 10)
+        width, height = struct.unpack("<HH", data[6:10])
+        return width & 0x3FFF, height & 0x3FFF
+    raise ValueError("Unsupported WebP chunk")
+
+
+def probe_stream(f: BinaryIO) -> Tuple[int, int]:
+    """
+    Return (width, height) of a PNG, JPEG or WebP image from its header.
+
+    Raises:
+        ValueError: unknown format or malformed header
+    """
+    start = f.tell()
+    try:
+        head = f.read(12)
+        f.seek(start)
+        if head.startswith(PNG_SIGNATURE):
+            return _probe_png(f)
+        if head.startswith(b"\xff\xd8"):
+            return _probe_jpeg(f)
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _probe_webp(f)
+    finally:
+        f.seek(start)
+    raise ValueError("Unsupported image format")
+
+
+def probe_dimensions(data: bytes) -> Tuple[int, int]:
+    """(width, height) of an encoded image held in memory"""
+    return probe_stream(io.BytesIO(data))
+
+
+def probe_file(path: str) -> Tuple[int, int]:
+    """(width, height) of an encoded image on disk"""
+    with open(path, "rb") as f:
+        return probe_stream(f)
+
+
+class LazyImage:
+    """
+    An encoded image with known dimensions whose pixels are decoded on
+    first use. Header probing falls back to PIL for formats it doesn't know.
+
+    Raises:
+        ValueError: neither the probe nor PIL recognizes the image
+    """
+
+    def __init__(self, source: Union[bytes, str]):
+        self.source = source
+        self._image = None
+        try:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                self.width, self.height = probe_dimensions(bytes(source))
+            else:
+                self.width, self.height = probe_file(source)
+        except ValueError:
+            # PIL's open is still header-only; load() decodes later
+            try:
+                self._image = self._open()
+            except UnidentifiedImageError as e:
+                raise ValueError("Unsupported image format") from e
+            self.width, self.height = self._image.size
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def _open(self) -> Image.Image:
+        if isinstance(self.source, (bytes, bytearray, memoryview)):
+            return Image.open(io.BytesIO(self.source))
+        return Image.open(self.source)
+
+    @property
+    def image(self) -> Image.Image:
+        """The decoded PIL image (decoded once, then cached)."""
+        if self._image is None:
+            self._image = self._open()
+        self._image.load()
+        return self._image
+
+    def release(self):
+        """Drop decoded pixels; they are decoded again if needed."""
+        self._image = None
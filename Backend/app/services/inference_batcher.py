@@ -0,0 +1,149 @@
+"""
+Micro-Batching Inference Scheduler
+
+Sits in front of the shared YOLO model and coalesces tiles submitted by
+concurrent detection requests into a single batched forward pass. The
+worker waits at most `max_wait_ms` after the first queued tile for more
+work, runs up to `max_batch_size` tiles together, and routes each result
+back to the future of the request that submitted it.
+
+A tile may be submitted as a zero-argument callable; it is only called
+when its batch is assembled, so a request with many queued tiles holds
+at most one batch of model-ready pixels at a time.
+"""
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from contextlib import nullcontext
+from typing import Callable, Dict, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class _TileRequest:
+    __slots__ = ("tile", "confidence", "future")
+
+    def __init__(self, tile, confidence: float):
+        self.tile = tile
+        self.confidence = confidence
+        self.future = Future()
+
+
+class MicroBatcher:
+    """Collects tiles from many callers and runs them as one model batch."""
+
+    def __init__(self, model, max_batch_size: int = 8, max_wait_ms: float = 5.0, lock=None):
+        """
+        Args:
+            model: Loaded YOLO model
+            max_batch_size: Upper bound on tiles per forward pass
+            max_wait_ms: How long the first tile in a batch may wait for company
+            lock: Lock shared with other users of the model (e.g. warmup)
+        """
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._lock = lock or nullcontext()
+        self._queue = queue.Queue()
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._tiles = 0
+        self._full_batches = 0
+
+        self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, tile: Union[np.ndarray, Callable[[], np.ndarray]], confidence: float) -> Future:
+        """
+        Queue one tile for inference.
+
+        `tile` is the model input, or a callable producing it when the
+        batch runs (see module docstring).
+
+        Returns:
+            Future resolving to the YOLO result for this tile. The batch runs at
+            the lowest confidence in it, so callers filter by their own threshold.
+        """
+        request = _TileRequest(tile, confidence)
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self._execute(batch)
+
+    def _execute(self, batch: list):
+        # A tile that fails to materialize only fails its own request
+        ready, tiles = [], []
+        for request in batch:
+            try:
+                tiles.append(request.tile() if callable(request.tile) else request.tile)
+            except Exception as e:
+                logger.exception("Failed to prepare tile for inference")
+                request.future.set_exception(e)
+                continue
+            ready.append(request)
+
+        if not ready:
+            return
+
+        confidence = min(request.confidence for request in ready)
+        try:
+            with self._lock:
+                results = self.model(
+                    tiles,
+                    conf=confidence,
+                    verbose=False
+                )
+        except Exception as e:
+            logger.exception("Batched inference failed for %d tiles", len(ready))
+            for request in ready:
+                request.future.set_exception(e)
+            return
+
+        del tiles
+        for request, result in zip(ready, results):
+            request.future.set_result(result)
+
+        with self._stats_lock:
+            self._batches += 1
+            self._tiles += len(ready)
+            if len(ready) == self.max_batch_size:
+                self._full_batches += 1
+
+    def stats(self) -> Dict:
+        """Batch fill metrics since startup."""
+        with self._stats_lock:
+            batches, tiles, full = self._batches, self._tiles, self._full_batches
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": batches,
+            "tiles": tiles,
+            "queued": self._queue.qsize(),
+            "avg_batch_size": round(tiles / batches, 2) if batches else 0.0,
+            "fill_rate": round(tiles / (batches * self.max_batch_size), 3) if batches else 0.0,
+            "full_batches": full,
+        }
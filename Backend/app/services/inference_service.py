@@ -0,0 +1,297 @@
+"""
+Inference Service
+
+Runs YOLO detection on page images, either in-process or by forwarding
+the request to the standalone inference server (app/inference_server.py)
+when INFERENCE_SOCKET is configured.
+
+Both paths return plain detection dicts in pixel coordinates:
+bbox_x1, bbox_y1, bbox_x2, bbox_y2, confidence, class_id, class_name.
+"""
+import os
+import time
+import logging
+import threading
+from typing import List, Dict
+from multiprocessing.connection import Client
+
+import numpy as np
+from PIL import Image
+
+from app.services.model_registry import MODEL_PRELOAD, get_model, get_model_status, load_model
+from app.services.image_probe import LazyImage
+from app.services.inference_batcher import MicroBatcher
+from app.services.shared_image import PackedBilevel, SharedImage
+from app.services.tiled_detection_service import TiledDetectionService
+
+logger = logging.getLogger(__name__)
+
+# Unix socket of the inference server; unset means run the model in-process
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET")
+INFERENCE_AUTHKEY = os.getenv("INFERENCE_AUTHKEY")
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "300"))
+
+# off | startup | background; MODEL_PRELOAD=1 keeps its old meaning
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "startup" if MODEL_PRELOAD else "off").lower()
+# Page sizes (WxH px) whose tile shapes are warmed: ARCH D, ANSI D, ANSI B at 300 DPI
+MODEL_WARMUP_PAGE_SIZES = os.getenv("MODEL_WARMUP_PAGE_SIZES", "10800x7200,10200x6600,5100x3300")
+
+# Cross-request micro-batching of tiles; a max batch of 1 disables it
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "8"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+
+# YOLO predictors keep per-call state and are not safe to share across threads
+_model_lock = threading.Lock()
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+_warmup_lock = threading.Lock()
+_warmup_state = {"state": "pending", "seconds": None, "tile_shapes": 0, "error": None}
+
+
+class InferenceError(Exception):
+    """Inference could not be performed; carries the HTTP status to surface."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def get_authkey():
+    return INFERENCE_AUTHKEY.encode() if INFERENCE_AUTHKEY else None
+
+
+def _detect_full_image(model, image) -> List[Dict]:
+    """Run the model once on the whole page."""
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    elif isinstance(image, PackedBilevel):
+        image = image.to_image()
+    elif isinstance(image, LazyImage):
+        image = image.image
+
+    results = model(image)
+    if isinstance(results, list) and len(results) > 1:
+        results = results[:1]
+
+    detections = []
+    for result in results:
+        if result.boxes is not None:
+            boxes = result.boxes.cpu().numpy()
+            xyxys = [box.xyxy[0] for box in boxes]
+            confs = [box.conf[0] for box in boxes]
+            clss = [box.cls[0] for box in boxes]
+        elif result.obb is not None:
+            obb = result.obb.cpu()
+            xyxys, confs, clss = obb.xyxy, obb.conf, obb.cls
+        else:
+            continue
+
+        for (x1, y1, x2, y2), conf, cls in zip(xyxys, confs, clss):
+            detections.append({
+                'bbox_x1': float(x1),
+                'bbox_y1': float(y1),
+                'bbox_x2': float(x2),
+                'bbox_y2': float(y2),
+                'confidence': float(conf),
+                'class_id': int(cls),
+                'class_name': result.names[int(cls)],
+            })
+
+    return detections
+
+
+def get_batcher(model):
+    """Process-wide tile batcher for the shared model, or None when disabled."""
+    global _batcher
+
+    if INFERENCE_MAX_BATCH <= 1:
+        return None
+    if _batcher is None or _batcher.model is not model:
+        with _batcher_lock:
+            if _batcher is None or _batcher.model is not model:
+                _batcher = MicroBatcher(
+                    model,
+                    max_batch_size=INFERENCE_MAX_BATCH,
+                    max_wait_ms=INFERENCE_MAX_WAIT_MS,
+                    lock=_model_lock,
+                )
+    return _batcher
+
+
+def detect_local(image, use_tiling: bool = True, confidence: float = 0.25, tile_ids=None) -> List[Dict]:
+    """Run detection with the model owned by this process."""
+    model = get_model()
+    if model is None:
+        raise InferenceError("AI model not loaded. Cannot run detections.", status_code=503)
+
+    if use_tiling:
+        batcher = get_batcher(model)
+        if batcher is not None:
+            # The batcher serializes model access itself
+            return TiledDetectionService(batcher=batcher).detect_with_tiling(
+                image, confidence=confidence, tile_ids=tile_ids
+            )
+
+    with _model_lock:
+        if use_tiling:
+            return TiledDetectionService(model=model).detect_with_tiling(
+                image, confidence=confidence, tile_ids=tile_ids
+            )
+        return _detect_full_image(model, image)
+
+
+def _request_remote(message: Dict) -> Dict:
+    """Send one request to the inference server and wait for its reply."""
+    try:
+        with Client(INFERENCE_SOCKET, family="AF_UNIX", authkey=get_authkey()) as conn:
+            conn.send(message)
+            if not conn.poll(INFERENCE_TIMEOUT):
+                raise InferenceError("Inference server timed out", status_code=504)
+            reply = conn.recv()
+    except (FileNotFoundError, ConnectionError, EOFError) as e:
+        logger.error("Inference server unavailable at %s: %s", INFERENCE_SOCKET, e)
+        raise InferenceError("Inference server unavailable", status_code=503)
+
+    if not reply.get("ok"):
+        raise InferenceError(reply.get("error", "Inference failed"), reply.get("status_code", 500))
+    return reply
+
+
+def detect_remote(image, use_tiling: bool = True, confidence: float = 0.25, tile_ids=None) -> List[Dict]:
+    """
+    Forward detection to the inference server.
+
+    The decoded page is written once into shared memory and only its
+    descriptor crosses the socket; the server tiles views of that buffer.
+    """
+    with SharedImage.create(image) as shared:
+        reply = _request_remote({
+            "op": "detect",
+            "image": shared.descriptor(),
+            "use_tiling": use_tiling,
+            "confidence": confidence,
+            "tile_ids": tile_ids,
+        })
+    return reply["detections"]
+
+
+def run_inference(image, use_tiling: bool = True, confidence: float = 0.25, tile_ids=None) -> List[Dict]:
+    """
+    Detect HVAC components on a page image.
+
+    Args:
+        image: PIL Image, LazyImage or numpy array (H x W or H x W x C)
+        use_tiling: Use tiled inference (recommended for large pages)
+        confidence: Confidence threshold for tiled inference
+        tile_ids: Restrict tiled inference to these tiles
+
+    Returns:
+        List of detection dicts in page pixel coordinates
+    """
+    if INFERENCE_SOCKET:
+        return detect_remote(image, use_tiling=use_tiling, confidence=confidence, tile_ids=tile_ids)
+    return detect_local(image, use_tiling=use_tiling, confidence=confidence, tile_ids=tile_ids)
+
+
+def _parse_page_sizes(value: str) -> List[tuple]:
+    sizes = []
+    for item in value.split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        width, height = item.split("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def warmup_model(force: bool = False) -> bool:
+    """
+    Load the model and push a blank tile of every configured tile shape
+    through it, so graph setup, kernel selection and allocations happen
+    before the first real request.
+
+    Returns:
+        True once the model is warm
+    """
+    with _warmup_lock:
+        if _warmup_state["state"] == "done" and not force:
+            return True
+
+        _warmup_state.update(state="running", error=None)
+        started = time.perf_counter()
+
+        model = load_model(force=force)
+        if model is None:
+            _warmup_state.update(state="failed", error=get_model_status()["error"])
+            return False
+
+        try:
+            tiler = TiledDetectionService(model=model)
+            shapes = set()
+            for width, height in _parse_page_sizes(MODEL_WARMUP_PAGE_SIZES):
+                shapes |= tiler.tile_shapes(width, height)
+                shapes |= tiler.tile_shapes(height, width)  # portrait sheets
+
+            with _model_lock:
+                for height, width in sorted(shapes):
+                    blank = np.full((height, width, 3), 255, dtype=np.uint8)
+                    model(blank, conf=tiler.confidence_threshold, verbose=False)
+        except Exception as e:
+            logger.exception("Model warmup failed")
+            _warmup_state.update(state="failed", error=f"{type(e).__name__}: {e}")
+            return False
+
+        _warmup_state.update(
+            state="done",
+            seconds=round(time.perf_counter() - started, 2),
+            tile_shapes=len(shapes),
+        )
+        logger.info("Model warmed up on %d tile shapes in %ss", len(shapes), _warmup_state["seconds"])
+        return True
+
+
+def start_background_warmup() -> threading.Thread:
+    """Warm the model without blocking the caller."""
+    thread = threading.Thread(target=warmup_model, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_local_status() -> Dict:
+    """Model status of this process, with the warmup readiness flag."""
+    return {
+        **get_model_status(),
+        "ready": _warmup_state["state"] == "done",
+        "warmup": dict(_warmup_state),
+        "batching": _batcher.stats() if _batcher is not None else None,
+    }
+
+
+def get_inference_status() -> Dict:
+    """Model status of whichever process runs inference."""
+    if not INFERENCE_SOCKET:
+        return {**get_local_status(), "backend": "local"}
+
+    try:
+        status = _request_remote({"op": "status"})["status"]
+    except InferenceError as e:
+        return {
+            "model_loaded": False,
+            "ready": False,
+            "backend": "remote",
+            "socket": INFERENCE_SOCKET,
+            "error": e.message,
+        }
+    return {**status, "backend": "remote", "socket": INFERENCE_SOCKET}
+
+
+def warmup_inference() -> Dict:
+    """Load and warm the model in whichever process runs inference."""
+    if INFERENCE_SOCKET:
+        _request_remote({"op": "warmup"})
+    elif not warmup_model(force=True):
+        raise InferenceError(_warmup_state["error"] or "Model warmup failed", status_code=503)
+    return get_inference_status()
@@ -0,0 +1,137 @@
+"""
+YOLO Model Registry
+
+Owns the process-wide detection model. torch and ultralytics are only
+imported the first time a model is actually needed, so API workers that
+serve CRUD traffic never pay the import/load cost.
+"""
+import os
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+default_model_path = Path(__file__).resolve().parents[2] / "best.pt"
+MODEL_PATH = os.getenv("MODEL_PATH", str(default_model_path))
+MODEL_TASK = os.getenv("MODEL_TASK")
+# Identifies the weights in cached detection results; bump when best.pt changes
+MODEL_VERSION = os.getenv("MODEL_VERSION") or os.path.basename(MODEL_PATH)
+
+# Load the model during app startup instead of on the first detection request
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "false").lower() in ("1", "true", "yes")
+
+_model = None
+_model_load_error = None
+_load_attempted = False
+_load_lock = threading.Lock()
+_torch_patched = False
+
+
+def _patch_torch_load():
+    """Patch torch.load to support older YOLO models (PyTorch 2.6 compatibility)."""
+    global _torch_patched
+    if _torch_patched:
+        return
+
+    import torch
+
+    _original_load = torch.load
+
+    def safe_load(*args, **kwargs):
+        if "weights_only" not in kwargs:
+            kwargs["weights_only"] = False
+        return _original_load(*args, **kwargs)
+
+    torch.load = safe_load
+    _torch_patched = True
+
+
+def _patch_yolo_heads(model):
+    """Patch older OBB/Segment/Pose heads missing the `detect` attribute."""
+    from ultralytics.nn.modules.head import Detect, OBB, Pose, Segment
+
+    torch_model = getattr(model, "model", None)
+    if torch_model is None:
+        return False
+    patched = False
+    for module in torch_model.modules():
+        if isinstance(module, (OBB, Segment, Pose)) and not hasattr(module, "detect"):
+            module.detect = Detect.forward
+            patched = True
+    return patched
+
+
+def load_yolo(model_path: str, task: str = None):
+    """
+    Import ultralytics and build a YOLO model from a weights file.
+
+    This is the only place the heavy ML stack gets imported.
+    """
+    _patch_torch_load()
+    from ultralytics import YOLO
+
+    model = YOLO(model_path, task=task) if task else YOLO(model_path)
+    if _patch_yolo_heads(model):
+        logger.info("Patched YOLO head modules missing 'detect' attribute.")
+    return model
+
+
+def load_model(force: bool = False):
+    """
+    Load the shared model if it has not been loaded yet.
+
+    Args:
+        force: Retry loading even if a previous attempt failed
+
+    Returns:
+        The YOLO model, or None if loading failed
+    """
+    global _model, _model_load_error, _load_attempted
+
+    if _load_attempted and not (force and _model is None):
+        return _model
+
+    with _load_lock:
+        if _load_attempted and not (force and _model is None):
+            return _model
+
+        if not os.path.exists(MODEL_PATH):
+            _model = None
+            _model_load_error = f"Model file not found at {MODEL_PATH}"
+            logger.error(_model_load_error)
+        else:
+            try:
+                _model = load_yolo(MODEL_PATH, MODEL_TASK)
+                _model_load_error = None
+                logger.info(
+                    "YOLO model loaded from %s (task=%s)",
+                    MODEL_PATH,
+                    MODEL_TASK or "auto",
+                )
+            except Exception as e:
+                _model = None
+                _model_load_error = f"{type(e).__name__}: {e}"
+                logger.exception("Failed to load YOLO model from %s", MODEL_PATH)
+
+        _load_attempted = True
+
+    return _model
+
+
+def get_model():
+    """Return the shared model, loading it on first use."""
+    return load_model()
+
+
+def get_model_status():
+    """Report model state without triggering a load."""
+    return {
+        "model_loaded": _model is not None,
+        "load_attempted": _load_attempted,
+        "model_path": MODEL_PATH,
+        "model_exists": os.path.exists(MODEL_PATH),
+        "model_task": MODEL_TASK or "auto",
+        "model_version": MODEL_VERSION,
+        "error": _model_load_error,
+    }
@@ -0,0 +1,112 @@
+"""
+Streaming Multipart Reader
+
+Parses a multipart/form-data request body incrementally and yields each
+file part as soon as its last byte has arrived, so callers can process
+part N while part N+1 is still on the wire. Part bodies are spooled to a
+temporary file (in memory while small), never the whole request.
+"""
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Dict
+
+from fastapi import HTTPException, Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+
+
+@dataclass
+class StreamedPart:
+    """One completed file part of a multipart body."""
+    name: str
+    filename: str
+    content_type: str
+    file: BinaryIO
+    size: int = 0
+
+
+async def iter_file_parts(request: Request, max_part_size: int) -> AsyncIterator[StreamedPart]:
+    """
+    Yield the file parts of a multipart request in arrival order.
+
+    Non-file fields are skipped. The caller owns (and should close) each
+    yielded part's file.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+
+    completed = []
+    current: Dict = {}
+
+    def on_part_begin():
+        current.clear()
+        current.update(headers={}, field=b"", value=b"", part=None)
+
+    def on_header_field(data, start, end):
+        current["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        current["value"] += data[start:end]
+
+    def on_header_end():
+        current["headers"][current["field"].lower()] = current["value"]
+        current["field"] = b""
+        current["value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(current["headers"].get(b"content-disposition", b""))
+        filename = disposition.get(b"filename")
+        if filename is None:
+            return  # plain form field
+        current["part"] = StreamedPart(
+            name=disposition.get(b"name", b"").decode("utf-8", "replace"),
+            filename=filename.decode("utf-8", "replace"),
+            content_type=current["headers"].get(b"content-type", b"").decode("latin-1"),
+            file=tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY),
+        )
+
+    def on_part_data(data, start, end):
+        part = current.get("part")
+        if part is None:
+            return
+        part.size += end - start
+        if part.size > max_part_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Part '{part.filename}' too large. Max {max_part_size // (1024 * 1024)}MB allowed"
+            )
+        part.file.write(data[start:end])
+
+    def on_part_end():
+        part = current.get("part")
+        if part is not None:
+            part.file.seek(0)
+            completed.append(part)
+            current["part"] = None
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+    })
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            while completed:
+                yield completed.pop(0)
+        parser.finalize()
+        while completed:
+            yield completed.pop(0)
+    finally:
+        for part in completed:
+            part.file.close()
+        if current.get("part") is not None:
+            current["part"].file.close()
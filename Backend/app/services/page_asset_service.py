@@ -0,0 +1,134 @@
+import hashlib
+from typing import Dict, List, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.services.base import BaseService
+from app.services.model_registry import MODEL_VERSION
+from app.models.page_assets import PageAsset, PdfAsset
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def detection_cache_key(use_tiling: bool, confidence: float = 0.25) -> str:
+    """Cached detections are only valid for the same method, weights and threshold."""
+    method = "tiled" if use_tiling else "full_image"
+    return f"{method}:{MODEL_VERSION}:{confidence}"
+
+
+class PageAssetService(BaseService):
+    """Content-addressed store of page rasters and their AI results"""
+
+    # =====================
+    # PDF ASSETS
+    # =====================
+
+    def get_pdf_pages(self, sha256: str) -> Optional[List[PageAsset]]:
+        """Page assets of a previously converted PDF, in page order, if all still exist"""
+        pdf = self.db.query(PdfAsset).filter(PdfAsset.sha256 == sha256).first()
+        if not pdf or not pdf.page_hashes:
+            return None
+
+        assets = self.get_page_assets(pdf.page_hashes)
+        if len(assets) != len(set(pdf.page_hashes)):
+            return None
+        return [assets[h] for h in pdf.page_hashes]
+
+    def register_pdf(self, sha256: str, page_hashes: List[str]) -> None:
+        # Upsert: the same PDF may be uploaded concurrently
+        stmt = pg_insert(PdfAsset.__table__).values(sha256=sha256, page_hashes=list(page_hashes))
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["sha256"],
+            set_={"page_hashes": stmt.excluded.page_hashes},
+        ))
+
+    # =====================
+    # PAGE ASSETS
+    # =====================
+
+    def get_page_asset(self, content_hash: str) -> Optional[PageAsset]:
+        if not content_hash:
+            return None
+        return self.db.query(PageAsset).filter(PageAsset.content_hash == content_hash).first()
+
+    def get_page_assets(self, content_hashes: List[str]) -> Dict[str, PageAsset]:
+        if not content_hashes:
+            return {}
+        assets = (
+            self.db.query(PageAsset)
+            .filter(PageAsset.content_hash.in_(set(content_hashes)))
+            .all()
+        )
+        return {a.content_hash: a for a in assets}
+
+    def register_page(
+        self,
+        content_hash: str,
+        upload_result: Dict,
+        width: int,
+        height: int,
+        pyramid: Dict = None,
+        thumbnail_url: str = None,
+        preview_url: str = None,
+    ) -> PageAsset:
+        """
+        Record a stored raster. When a concurrent upload of the same raster
+        registered it first, that row is kept and returned.
+        """
+        self.db.execute(
+            pg_insert(PageAsset.__table__)
+            .values(
+                content_hash=content_hash,
+                image_url=upload_result["url"],
+                cloudinary_public_id=upload_result["public_id"],
+                width=width,
+                height=height,
+                pyramid=pyramid,
+                thumbnail_url=thumbnail_url,
+                preview_url=preview_url,
+            )
+            .on_conflict_do_nothing(index_elements=["content_hash"])
+        )
+        return self.get_page_asset(content_hash)
+
+    # =====================
+    # DETECTION CACHE
+    # =====================
+
+    def get_cached_detections(self, content_hash: str, key: str) -> Optional[List[Dict]]:
+        """Raw AI detections previously computed for an identical raster"""
+        asset = self.get_page_asset(content_hash)
+        if not asset or asset.detections_key != key or asset.detections is None:
+            return None
+        return asset.detections
+
+    def store_detections(
+        self,
+        content_hash: str,
+        key: str,
+        detections: List[Dict],
+        fingerprint: bytes = None,
+    ) -> None:
+        asset = self.get_page_asset(content_hash)
+        if not asset:
+            return
+        asset.detections_key = key
+        asset.detections = [
+            {k: v for k, v in det.items() if not k.startswith("_")}
+            for det in detections
+        ]
+        if fingerprint is not None:
+            asset.fingerprint = fingerprint
@@ -0,0 +1,317 @@
+"""
+Page Raster Encoding
+
+Controls how rendered page rasters are encoded before upload, derives a
+thumbnail and a medium-resolution preview per page, and, when enabled,
+cuts each page into a DeepZoom tile pyramid so the editor only fetches
+the tiles on screen at the current zoom.
+
+Settings (environment):
+    RASTER_FORMAT           png | webp (lossless)                 [png]
+    RASTER_PNG_COMPRESS     zlib level 0-9; unset keeps Poppler's
+                            PNG output untouched                   [unset]
+    RASTER_COLOR_MODE       rgb | gray | bilevel                   [rgb]
+    RASTER_BILEVEL_THRESHOLD  gray levels below this become black  [200]
+    RASTER_TILE_PYRAMID     build a DeepZoom pyramid per page; each
+                            tile is its own Cloudinary upload (a
+                            7200x5400 page is ~200 uploads)         [false]
+    RASTER_TILE_SIZE        pyramid tile edge in pixels            [512]
+    RASTER_TILE_UPLOAD_THREADS  parallel tile uploads              [8]
+    RASTER_PREVIEWS         thumbnail + preview per page; made
+                            locally when the page is decoded anyway,
+                            else as Cloudinary delivery URLs        [true]
+    RASTER_PREVIEW_SIZE     preview long edge in pixels            [1600]
+    RASTER_THUMBNAIL_SIZE   thumbnail long edge in pixels          [256]
+"""
+import io
+import os
+import math
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from PIL import Image
+
+from app.services.cloudinary_service import CloudinaryService
+
+logger = logging.getLogger(__name__)
+
+RASTER_FORMAT = os.getenv("RASTER_FORMAT", "png").lower()
+_png_compress = os.getenv("RASTER_PNG_COMPRESS")
+RASTER_PNG_COMPRESS = int(_png_compress) if _png_compress else None
+RASTER_COLOR_MODE = os.getenv("RASTER_COLOR_MODE", "rgb").lower()
+# High enough that anti-aliased hairlines survive thresholding
+RASTER_BILEVEL_THRESHOLD = int(os.getenv("RASTER_BILEVEL_THRESHOLD", "200"))
+
+RASTER_TILE_PYRAMID = os.getenv("RASTER_TILE_PYRAMID", "false").lower() in ("1", "true", "yes")
+RASTER_TILE_SIZE = int(os.getenv("RASTER_TILE_SIZE", "512"))
+RASTER_TILE_OVERLAP = 1
+RASTER_TILE_UPLOAD_THREADS = int(os.getenv("RASTER_TILE_UPLOAD_THREADS", "8"))
+
+RASTER_PREVIEWS = os.getenv("RASTER_PREVIEWS", "true").lower() in ("1", "true", "yes")
+RASTER_PREVIEW_SIZE = int(os.getenv("RASTER_PREVIEW_SIZE", "1600"))
+RASTER_THUMBNAIL_SIZE = int(os.getenv("RASTER_THUMBNAIL_SIZE", "256"))
+# Previews are for display only, so a lossy encoding is fine
+PREVIEW_QUALITY = 80
+
+# WebP cannot store images larger than this on either side
+WEBP_MAX_DIMENSION = 16383
+
+_PIL_MODES = {"rgb": "RGB", "gray": "L", "bilevel": "1"}
+
+if RASTER_FORMAT not in ("png", "webp"):
+    raise ValueError(f"Unsupported RASTER_FORMAT '{RASTER_FORMAT}'")
+if RASTER_COLOR_MODE not in _PIL_MODES:
+    raise ValueError(f"Unsupported RASTER_COLOR_MODE '{RASTER_COLOR_MODE}'")
+
+
+def is_passthrough() -> bool:
+    """True when Poppler's own PNG output is uploaded as-is."""
+    return RASTER_FORMAT == "png" and RASTER_PNG_COMPRESS is None and RASTER_COLOR_MODE != "bilevel"
+
+
+def render_grayscale() -> bool:
+    """
+    Render single-channel pages. Line drawings lose nothing, and every
+    later stage (encode, decode, tiling) handles a third of the bytes.
+    """
+    return RASTER_COLOR_MODE != "rgb"
+
+
+def to_color_mode(image: Image.Image) -> Image.Image:
+    """Convert a page raster to the configured color mode."""
+    if RASTER_COLOR_MODE == "bilevel":
+        if image.mode == "1":
+            return image
+        if image.mode != "L":
+            image = image.convert("L")
+        # Hard threshold: dithering would scatter noise along every line
+        return image.point(lambda v: 255 if v >= RASTER_BILEVEL_THRESHOLD else 0, mode="1")
+
+    mode = _PIL_MODES[RASTER_COLOR_MODE]
+    return image if image.mode == mode else image.convert(mode)
+
+
+def render_format() -> str:
+    """
+    pdftoppm output format. When we re-encode anyway, render uncompressed
+    PPM so each page is compressed once instead of twice.
+    """
+    return "png" if is_passthrough() else "ppm"
+
+
+def _save(image: Image.Image, out, fmt: str) -> str:
+    if fmt == "webp" and max(image.size) > WEBP_MAX_DIMENSION:
+        fmt = "png"
+
+    if fmt == "webp":
+        if image.mode == "1":
+            image = image.convert("L")
+        # method 0-1 is the fast end of WebP's lossless encoder
+        image.save(out, format="WEBP", lossless=True, quality=0, method=1)
+    else:
+        compress_level = 6 if RASTER_PNG_COMPRESS is None else RASTER_PNG_COMPRESS
+        image.save(out, format="PNG", compress_level=compress_level)
+    return fmt
+
+
+def encode_page(image: Image.Image, out_path: str) -> str:
+    """
+    Encode a decoded page raster with the configured format and color mode.
+
+    Returns:
+        Path of the encoded file (extension reflects the format used)
+    """
+    image = to_color_mode(image)
+
+    root, _ = os.path.splitext(out_path)
+    fmt = RASTER_FORMAT
+    if fmt == "webp" and max(image.size) > WEBP_MAX_DIMENSION:
+        fmt = "png"
+    path = f"{root}.{fmt}"
+    with open(path, "wb") as f:
+        _save(image, f, fmt)
+    return path
+
+
+def upload_page(file_content, filename: str) -> Dict:
+    """
+    Upload a page raster. Poppler's PNGs go through the usual image upload;
+    pages we encoded ourselves, or cut into a pyramid, are stored byte-exact
+    so Cloudinary neither re-encodes them nor resizes them away from the
+    pyramid's dimensions.
+    """
+    if is_passthrough() and not RASTER_TILE_PYRAMID:
+        return CloudinaryService.upload_image(file_content, filename)
+    return CloudinaryService.upload_raster(file_content, f"images/{filename}")
+
+
+def _pyramid_levels(width: int, height: int) -> int:
+    """Index of the full-resolution DeepZoom level"""
+    return max(0, math.ceil(math.log2(max(width, height, 1))))
+
+
+def build_pyramid(image: Image.Image, content_hash: str) -> Dict:
+    """
+    Cut a page into a DeepZoom pyramid and upload every tile.
+
+    Tiles are stored as `pyramids/<hash>_files/<level>/<col>_<row>`, the
+    layout DeepZoom viewers expect, and are content-addressed like the page.
+
+    Returns:
+        DZI descriptor in its JSON form (usable as an OpenSeadragon tile source)
+    """
+    image = to_color_mode(image)
+    if image.mode == "1":
+        # Box downsampling needs 8-bit samples
+        image = image.convert("L")
+    elif image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+
+    width, height = image.size
+    tile_size, overlap = RASTER_TILE_SIZE, RASTER_TILE_OVERLAP
+    fmt = "webp" if RASTER_FORMAT == "webp" else "png"
+    base_id = f"pyramids/{content_hash}_files"
+
+    max_level = _pyramid_levels(width, height)
+    level_image = image
+    uploads = []
+    tile_count = 0
+
+    with ThreadPoolExecutor(max_workers=RASTER_TILE_UPLOAD_THREADS) as pool:
+        for level in range(max_level, -1, -1):
+            lw, lh = level_image.size
+            for col in range(math.ceil(lw / tile_size)):
+                for row in range(math.ceil(lh / tile_size)):
+                    x0 = max(0, col * tile_size - overlap)
+                    y0 = max(0, row * tile_size - overlap)
+                    x1 = min(lw, (col + 1) * tile_size + overlap)
+                    y1 = min(lh, (row + 1) * tile_size + overlap)
+
+                    buffer = io.BytesIO()
+                    _save(level_image.crop((x0, y0, x1, y1)), buffer, fmt)
+                    uploads.append(pool.submit(
+                        CloudinaryService.upload_raster,
+                        buffer.getvalue(),
+                        f"{base_id}/{level}/{col}_{row}",
+                    ))
+                    tile_count += 1
+
+            if level > 0:
+                # DeepZoom levels halve (rounding up) down to 1x1
+                level_image = level_image.reduce(2)
+
+        for future in uploads:
+            future.result()
+
+    logger.info("Uploaded %d pyramid tiles for page %s", tile_count, content_hash[:12])
+
+    return {
+        "Image": {
+            "xmlns": "http://schemas.microsoft.com/deepzoom/2008",
+            "Url": CloudinaryService.get_image_with_transformations(base_id, {"secure": True}) + "/",
+            "Format": fmt,
+            "Overlap": str(overlap),
+            "TileSize": str(tile_size),
+            "Size": {"Width": str(width), "Height": str(height)},
+        }
+    }
+
+
+def needs_pixels() -> bool:
+    """
+    Whether storing a page requires decoding it (vs. uploading the file as-is).
+    Previews never force a decode; see delivery_previews.
+    """
+    return not is_passthrough() or RASTER_TILE_PYRAMID
+
+
+def _downscale(image: Image.Image, long_edge: int) -> Image.Image:
+    scale = long_edge / max(image.size)
+    if scale >= 1:
+        return image
+    # Integer box reduction first (fast), then an exact high-quality resize
+    factor = int(1 / scale)
+    if factor >= 2:
+        image = image.reduce(factor)
+    size = (
+        max(1, round(image.width * long_edge / max(image.size))),
+        max(1, round(image.height * long_edge / max(image.size))),
+    )
+    return image.resize(size, Image.LANCZOS)
+
+
+def _upload_preview(image: Image.Image, public_id: str) -> str:
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=PREVIEW_QUALITY, method=4)
+    return CloudinaryService.upload_raster(buffer.getvalue(), public_id)["url"]
+
+
+def build_previews(image: Image.Image, content_hash: str) -> Dict[str, str]:
+    """
+    Derive and upload a preview and a thumbnail from one decoded raster.
+
+    The full-resolution page is reduced once to the preview; the thumbnail
+    is then made from the preview, never from the full page again.
+
+    Returns:
+        {"preview_url": ..., "thumbnail_url": ...}
+    """
+    if image.mode not in ("L", "RGB"):
+        # 1-bit lines come out anti-aliased once downsampled in 8-bit
+        image = image.convert("L" if image.mode in ("1", "LA") else "RGB")
+
+    preview = _downscale(image, RASTER_PREVIEW_SIZE)
+    thumbnail = _downscale(preview, RASTER_THUMBNAIL_SIZE)
+
+    return {
+        "preview_url": _upload_preview(preview, f"previews/{content_hash}"),
+        "thumbnail_url": _upload_preview(thumbnail, f"thumbnails/{content_hash}"),
+    }
+
+
+def delivery_previews(public_id: str) -> Dict[str, str]:
+    """
+    Preview and thumbnail as Cloudinary delivery transformations of the
+    uploaded page, for pages ingested without decoding. Cloudinary renders
+    each one on first request; nothing is decoded or uploaded here.
+    """
+    if not RASTER_PREVIEWS:
+        return {}
+
+    def url(long_edge: int) -> str:
+        return CloudinaryService.get_image_with_transformations(public_id, {
+            "secure": True,
+            "width": long_edge,
+            "height": long_edge,
+            "crop": "limit",
+            "quality": PREVIEW_QUALITY,
+            "format": "webp",
+        })
+
+    return {
+        "preview_url": url(RASTER_PREVIEW_SIZE),
+        "thumbnail_url": url(RASTER_THUMBNAIL_SIZE),
+    }
+
+
+def maybe_build_previews(image: Image.Image, content_hash: str) -> Dict[str, str]:
+    """Build previews if enabled; a failure leaves the page without them"""
+    if not RASTER_PREVIEWS:
+        return {}
+    try:
+        return build_previews(image, content_hash)
+    except Exception:
+        logger.exception("Failed to build previews for page %s", content_hash[:12])
+        return {}
+
+
+def maybe_build_pyramid(image: Image.Image, content_hash: str) -> Optional[Dict]:
+    """Build the pyramid if enabled; a failure only loses the pyramid, not the page"""
+    if not RASTER_TILE_PYRAMID:
+        return None
+    try:
+        return build_pyramid(image, content_hash)
+    except Exception:
+        logger.exception("Failed to build tile pyramid for page %s", content_hash[:12])
+        return None
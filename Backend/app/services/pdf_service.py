@@ -1,74 +1,192 @@
 import os
-import io
 import uuid
 import logging
-from pathlib import Path
-import torch
-from fastapi import UploadFile, HTTPException
-from pdf2image import convert_from_bytes
+import tempfile
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from pdf2image import convert_from_path
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
-# Import tiled detection service
-from app.services.tiled_detection_service import TiledDetectionService
-
-_original_load = torch.load
-def safe_load(*args, **kwargs):
-    if "weights_only" not in kwargs:
-        kwargs["weights_only"] = False
-    return _original_load(*args, **kwargs)
-torch.load = safe_load
-
-default_model_path = Path(__file__).resolve().parents[2] / "best.pt"
-MODEL_PATH = os.getenv("MODEL_PATH", str(default_model_path))
-MODEL_TASK = os.getenv("MODEL_TASK")
-MODEL_LOAD_ERROR = None
-
-try:
-    from ultralytics import YOLO
-    from ultralytics.nn.modules.head import Detect, OBB, Pose, Segment
-
-    def _patch_yolo_heads(model):
-        """Patch older OBB/Segment/Pose heads missing the `detect` attribute."""
-        torch_model = getattr(model, "model", None)
-        if torch_model is None:
-            return False
-        patched = False
-        for module in torch_model.modules():
-            if isinstance(module, (OBB, Segment, Pose)) and not hasattr(module, "detect"):
-                module.detect = Detect.forward
-                patched = True
-        return patched
-
-    if os.path.exists(MODEL_PATH):
-        ai_model = YOLO(MODEL_PATH, task=MODEL_TASK) if MODEL_TASK else YOLO(MODEL_PATH)
-        if _patch_yolo_heads(ai_model):
-            logger.info("Patched YOLO head modules missing 'detect' attribute.")
-        logger.info(
-            "YOLO model loaded from %s (task=%s)",
-            MODEL_PATH,
-            MODEL_TASK or "auto",
-        )
-    else:
-        ai_model = None
-        MODEL_LOAD_ERROR = f"Model file not found at {MODEL_PATH}"
-        logger.error(MODEL_LOAD_ERROR)
-except Exception as e:
-    ai_model = None
-    MODEL_LOAD_ERROR = f"{type(e).__name__}: {e}"
-    logger.exception("Failed to load YOLO model from %s", MODEL_PATH)
+# Parallel pdftoppm processes used to rasterize one PDF
+PDF_RENDER_THREADS = int(os.getenv("PDF_RENDER_THREADS", "1"))
+PDF_RENDER_DPI = 300
+
+# Model loading is deferred to first use (see model_registry)
+from app.services.inference_service import InferenceError, run_inference
 
 from app.services.base import BaseService
-from app.services.cloudinary_service import CloudinaryService
+from app.services.upload_spool import UPLOAD_SPOOL_DIR
+from app.services.page_asset_service import PageAssetService, hash_bytes, hash_file
+from app.services.image_probe import LazyImage, probe_file
+from app.services import page_raster_service as raster
+from app.services.vector_extraction_service import PageVectorService
 from app.models.projects import Project
 from app.models.pages import Page
 from app.models.detections import Detection
+from app.models.page_assets import PageAsset
+from app.services.detection_encoding import BOX_COLUMNS, boxes_to_dicts, encode_columnar
 
 
 class PDFService(BaseService):
 
-    async def upload_and_convert(self, project_id: str, file: UploadFile):
+    def _add_page(self, project_id: str, page_number: int, asset: PageAsset, previous: dict = None):
+        """
+        Create a Page backed by a stored raster and return its payload.
+
+        `previous` maps page numbers to the raster hashes of the set being
+        replaced; a changed sheet remembers its predecessor so re-detection
+        can run only on the tiles that differ.
+        """
+        previous_hash = (previous or {}).get(page_number)
+        page_id = str(uuid.uuid4())
+        page = Page(
+            id=page_id,
+            project_id=project_id,
+            page_number=page_number,
+            image_url=asset.image_url,
+            cloudinary_public_id=asset.cloudinary_public_id,
+            width=asset.width,
+            height=asset.height,
+            content_hash=asset.content_hash,
+            previous_content_hash=previous_hash if previous_hash != asset.content_hash else None,
+            pyramid=asset.pyramid,
+            thumbnail_url=asset.thumbnail_url,
+            preview_url=asset.preview_url,
+        )
+        self.db.add(page)
+
+        return {
+            "page_id": page_id,
+            "page_number": page_number,
+            "image_url": asset.image_url,
+            "width": asset.width,
+            "height": asset.height,
+            "thumbnail_url": asset.thumbnail_url,
+            "preview_url": asset.preview_url,
+            "pyramid": asset.pyramid,
+            "bounding_boxes": [],
+        }
+
+    def _store_rendered_page(
+        self,
+        project_id: str,
+        page_number: int,
+        page_path: str,
+        content_hash: str,
+        assets: PageAssetService,
+    ) -> PageAsset:
+        """Encode (if configured) and upload one rendered page raster"""
+        pyramid = None
+        previews = {}
+        if not raster.needs_pixels():
+            # Dimensions come from the PNG header; pixels are never decoded
+            width, height = probe_file(page_path)
+            upload_path = page_path
+        else:
+            # Decoded once; every derived raster comes from this image
+            with Image.open(page_path) as image:
+                width, height = image.size
+                upload_path = (
+                    page_path if raster.is_passthrough()
+                    else raster.encode_page(image, page_path)
+                )
+                previews = raster.maybe_build_previews(image, content_hash)
+                pyramid = raster.maybe_build_pyramid(image, content_hash)
+
+        filename = f"{project_id}_{uuid.uuid4()}_page_{page_number}"
+        upload_result = raster.upload_page(upload_path, filename)
+        if not previews:
+            previews = raster.delivery_previews(upload_result["public_id"])
+        return assets.register_page(content_hash, upload_result, width, height, pyramid, **previews)
+
+    async def _extract_vectors(self, pdf_path: str, page_hashes: list):
+        """Store the PDF's text and line geometry for pages that lack it"""
+        extracted = await run_in_threadpool(
+            PageVectorService(self.db).extract_pdf,
+            pdf_path,
+            page_hashes,
+            PDF_RENDER_DPI / 72,
+        )
+        if extracted:
+            logger.info("Extracted text and vectors from %d pages", extracted)
+
+    async def _render_pages(
+        self,
+        project_id: str,
+        pdf_path: str,
+        pdf_sha256: str,
+        assets: PageAssetService,
+        previous: dict = None,
+    ):
+        """
+        Rasterize a PDF and upload only pages whose raster is not stored yet.
+
+        Poppler writes page rasters straight into a temp folder, and each page
+        is hashed and uploaded from disk, so at most one page is open at a time.
+        Encoding follows page_raster_service settings.
+        """
+        with tempfile.TemporaryDirectory(dir=UPLOAD_SPOOL_DIR) as render_dir:
+            try:
+                page_paths = await run_in_threadpool(
+                    convert_from_path,
+                    pdf_path,
+                    dpi=PDF_RENDER_DPI,
+                    fmt=raster.render_format(),
+                    grayscale=raster.render_grayscale(),
+                    output_folder=render_dir,
+                    paths_only=True,
+                    thread_count=PDF_RENDER_THREADS,
+                )
+            except Exception:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Failed to process PDF. Ensure Poppler is installed."
+                )
+
+            page_data = []
+            page_hashes = []
+            registered = {}
+            reused = 0
+
+            for i, page_path in enumerate(page_paths, start=1):
+                content_hash = hash_file(page_path)
+                page_hashes.append(content_hash)
+
+                # Unchanged sheet (e.g. in a revision set): skip the upload
+                asset = registered.get(content_hash) or assets.get_page_asset(content_hash)
+                if asset:
+                    reused += 1
+                else:
+                    asset = await run_in_threadpool(
+                        self._store_rendered_page,
+                        project_id,
+                        i,
+                        page_path,
+                        content_hash,
+                        assets,
+                    )
+
+                registered[content_hash] = asset
+                page_data.append(self._add_page(project_id, i, asset, previous))
+
+        if pdf_sha256:
+            assets.register_pdf(pdf_sha256, page_hashes)
+
+        await self._extract_vectors(pdf_path, page_hashes)
+
+        logger.info("Rendered %d pages, reused %d stored rasters", len(page_data), reused)
+        return page_data
+
+    async def upload_and_convert(self, project_id: str, pdf_path: str, pdf_sha256: str = None):
+        """
+        Rasterize a PDF already spooled to disk and upload its pages.
+
+        Rasters are content-addressed: a PDF converted before is not rendered
+        again, and pages identical to a stored raster are not re-uploaded.
+        """
         project = (
             self.db.query(Project)
             .filter(Project.id == project_id)
@@ -77,11 +195,92 @@ class PDFService(BaseService):
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
+        previous = self._clear_pages(project)
+
+        assets = PageAssetService(self.db)
+
+        # Identical PDF seen before: reuse its rasters without rendering
+        known_pages = assets.get_pdf_pages(pdf_sha256) if pdf_sha256 else None
+        if known_pages is not None:
+            logger.info("PDF %s already converted; reusing %d pages", pdf_sha256[:12], len(known_pages))
+            page_data = [
+                self._add_page(project_id, i, asset, previous)
+                for i, asset in enumerate(known_pages, start=1)
+            ]
+            # No-op unless the PDF was converted before extraction existed
+            await self._extract_vectors(pdf_path, [a.content_hash for a in known_pages])
+        else:
+            page_data = await self._render_pages(project_id, pdf_path, pdf_sha256, assets, previous)
+
+        project.page_count = len(page_data)
+        if page_data:
+            project.pdf_url = page_data[0]["image_url"]
+            project.thumbnail_url = page_data[0]["thumbnail_url"]
+
+        self.db.commit()
+
+        return {
+            "message": "PDF uploaded and converted successfully",
+            "pages": page_data,
+            "pageCount": len(page_data),
+        }
+
+    def _ingest_page_image(
+        self,
+        project_id: str,
+        page_number: int,
+        image_bytes: bytes,
+        assets: PageAssetService,
+        registered: dict,
+        previous: dict = None,
+    ):
+        """Store one client-rendered page image (deduplicated) and add its Page"""
+        content_hash = hash_bytes(image_bytes)
+
+        # Same image stored before: reuse it instead of uploading
+        asset = registered.get(content_hash) or assets.get_page_asset(content_hash)
+        if not asset:
+            # Header-only probe; the pixels are not needed for ingestion
+            image = LazyImage(image_bytes)
+
+            # Upload to Cloudinary
+            filename = f"{project_id}_{uuid.uuid4()}_page_{page_number}"
+            upload_result = raster.upload_page(image_bytes, filename)
+            # Client-encoded images are stored as sent; only previews and
+            # the pyramid are derived from them
+            pyramid = None
+            previews = {}
+            if raster.RASTER_TILE_PYRAMID:
+                # Decoded for the pyramid anyway, so previews come from it too
+                previews = raster.maybe_build_previews(image.image, content_hash)
+                pyramid = raster.maybe_build_pyramid(image.image, content_hash)
+                image.release()
+            else:
+                previews = raster.delivery_previews(upload_result["public_id"])
+            asset = assets.register_page(
+                content_hash, upload_result, image.width, image.height, pyramid, **previews
+            )
+
+        registered[content_hash] = asset
+        return self._add_page(project_id, page_number, asset, previous)
+
+    def _clear_pages(self, project: Project) -> dict:
+        """
+        Delete all pages (and their detections) of a project.
+
+        Returns:
+            {page_number: content_hash} of the deleted pages
+        """
         existing_pages = (
             self.db.query(Page)
-            .filter(Page.project_id == project_id)
+            .filter(Page.project_id == project.id)
             .all()
         )
+        previous = {
+            page.page_number: page.content_hash
+            for page in existing_pages
+            if page.content_hash
+        }
 
         for page in existing_pages:
             self.db.query(Detection).filter(
@@ -91,66 +290,86 @@ class PDFService(BaseService):
 
         project.page_count = 0
         project.pdf_url = None
+        project.thumbnail_url = None
         self.db.commit()
+        return previous
 
-        pdf_bytes = await file.read()
-
-        try:
-            images = convert_from_bytes(
-                pdf_bytes,
-                dpi=300,
-                fmt="png",
-            )
-        except Exception:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to process PDF. Ensure Poppler is installed."
-            )
-
-        page_data = []
-
-        for i, image in enumerate(images, start=1):
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format="PNG")
-            img_byte_arr.seek(0)
-
-            filename = f"{project_id}_{uuid.uuid4()}_page_{i}"
-            upload_result = CloudinaryService.upload_image(
-                img_byte_arr.getvalue(),
-                filename
-            )
+    async def upload_page_stream(self, project_id: str, parts, append: bool = False):
+        """
+        Store page images from a streamed multipart body, one part at a time.
 
-            page_id = str(uuid.uuid4())
-            page = Page(
-                id=page_id,
-                project_id=project_id,
-                page_number=i,
-                image_url=upload_result["url"],
-                cloudinary_public_id=upload_result["public_id"],
-                width=image.width,
-                height=image.height,
-            )
-            self.db.add(page)
+        Each part is stored and committed as soon as it has fully arrived, so
+        there is no limit on pages per request and memory holds one page.
 
-            page_data.append({
-                "page_id": page_id,
-                "page_number": i,
-                "image_url": upload_result["url"],
-                "width": image.width,
-                "height": image.height,
-                "bounding_boxes": [],
-            })
+        Args:
+            project_id: Project ID
+            parts: Async iterator of StreamedPart (see multipart_stream)
+            append: Add pages after the existing ones instead of replacing them
+        """
+        project = (
+            self.db.query(Project)
+            .filter(Project.id == project_id)
+            .first()
+        )
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
 
-        project.page_count = len(images)
-        if page_data:
-            project.pdf_url = page_data[0]["image_url"]
+        if append:
+            last_page_number = (
+                self.db.query(func.max(Page.page_number))
+                .filter(Page.project_id == project_id)
+                .scalar()
+            ) or 0
+            previous = {}
+        else:
+            previous = self._clear_pages(project)
+            last_page_number = 0
+
+        assets = PageAssetService(self.db)
+        registered = {}
+        page_data = []
 
-        self.db.commit()
+        async for part in parts:
+            page_number = last_page_number + len(page_data) + 1
+            with part.file:
+                try:
+                    image_bytes = part.file.read()
+                    page = await run_in_threadpool(
+                        self._ingest_page_image,
+                        project_id,
+                        page_number,
+                        image_bytes,
+                        assets,
+                        registered,
+                        previous,
+                    )
+                except ValueError as e:
+                    # Not an image we can read; the client's fault
+                    self.db.rollback()
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Invalid image for page {page_number} ({part.filename}): {str(e)}"
+                    )
+                except Exception as e:
+                    self.db.rollback()
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to process page {page_number} ({part.filename}): {str(e)}"
+                    )
+
+            page_data.append(page)
+            project.page_count = page_number
+            if not project.pdf_url:
+                project.pdf_url = page["image_url"]
+            if not project.thumbnail_url:
+                project.thumbnail_url = page["thumbnail_url"]
+            # Commit per page so completed pages survive a dropped stream
+            self.db.commit()
 
         return {
-            "message": "PDF uploaded and converted successfully",
+            "message": "Pages uploaded successfully",
             "pages": page_data,
-            "pageCount": len(images),
+            "pageCount": project.page_count,
         }
 
     async def upload_pre_converted_pages(self, project_id: str, page_files: list):
@@ -167,58 +386,24 @@ class PDFService(BaseService):
             raise HTTPException(status_code=404, detail="Project not found")
 
         # Clear existing pages
-        existing_pages = (
-            self.db.query(Page)
-            .filter(Page.project_id == project_id)
-            .all()
-        )
-
-        for page in existing_pages:
-            self.db.query(Detection).filter(
-                Detection.page_id == page.id
-            ).delete()
-            self.db.delete(page)
-
-        project.page_count = 0
-        project.pdf_url = None
-        self.db.commit()
+        previous = self._clear_pages(project)
 
+        assets = PageAssetService(self.db)
+        registered = {}
         page_data = []
 
         for i, page_file in enumerate(page_files, start=1):
             try:
                 # Read the image file
                 image_bytes = await page_file.read()
-                image = Image.open(io.BytesIO(image_bytes))
-                
-                # Upload to Cloudinary
-                filename = f"{project_id}_{uuid.uuid4()}_page_{i}"
-                upload_result = CloudinaryService.upload_image(
-                    image_bytes,
-                    filename
+                page_data.append(
+                    self._ingest_page_image(project_id, i, image_bytes, assets, registered, previous)
                 )
-
-                page_id = str(uuid.uuid4())
-                page = Page(
-                    id=page_id,
-                    project_id=project_id,
-                    page_number=i,
-                    image_url=upload_result["url"],
-                    cloudinary_public_id=upload_result["public_id"],
-                    width=image.width,
-                    height=image.height,
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid image for page {i}: {str(e)}"
                 )
-                self.db.add(page)
-
-                page_data.append({
-                    "page_id": page_id,
-                    "page_number": i,
-                    "image_url": upload_result["url"],
-                    "width": image.width,
-                    "height": image.height,
-                    "bounding_boxes": [],
-                })
-                
             except Exception as e:
                 raise HTTPException(
                     status_code=500,
@@ -228,6 +413,7 @@ class PDFService(BaseService):
         project.page_count = len(page_files)
         if page_data:
             project.pdf_url = page_data[0]["image_url"]
+            project.thumbnail_url = page_data[0]["thumbnail_url"]
 
         self.db.commit()
 
@@ -237,102 +423,71 @@ class PDFService(BaseService):
             "pageCount": len(page_files),
         }
 
-    def generate_detections(self, page_id: str, project_id: str, image: Image.Image):
-        if not ai_model:
-            message = "AI model not loaded. Cannot run detections."
-            logger.error(message)
-            raise HTTPException(status_code=503, detail=message)
+    def save_detections(self, page_id: str, project_id: str, detections: list):
+        """Add AI detections to the session and build the bounding box payload"""
+        bounding_boxes = []
 
-        try:
-            results = ai_model(image)
-            if isinstance(results, list) and len(results) > 1:
-                results = results[:1]
-            bounding_boxes = []
-
-            for result in results:
-                if result.boxes is not None:
-                    boxes = result.boxes.cpu().numpy()
-                    for box in boxes:
-                        x1, y1, x2, y2 = box.xyxy[0]
-                        conf = float(box.conf[0])
-                        cls = int(box.cls[0])
-                        label = result.names[cls]
-
-                        bb_id = str(uuid.uuid4())
-                        record = Detection(
-                            id=bb_id,
-                            page_id=page_id,
-                            project_id=project_id,
-                            class_name=label,
-                            confidence=conf,
-                            bbox_x1=float(x1),
-                            bbox_y1=float(y1),
-                            bbox_x2=float(x2),
-                            bbox_y2=float(y2),
-                            is_manual=False,
-                            is_edited=False,
-                        )
-                        self.db.add(record)
-
-                        bounding_boxes.append({
-                            "id": bb_id,
-                            "x1": float(x1),
-                            "y1": float(y1),
-                            "x2": float(x2),
-                            "y2": float(y2),
-                            "label": label,
-                            "confidence": conf,
-                            "is_manual": False,
-                            "is_edited": False,
-                        })
-                elif result.obb is not None:
-                    obb = result.obb.cpu()
-                    xyxys = obb.xyxy
-                    confs = obb.conf
-                    clss = obb.cls
-                    for i in range(len(obb)):
-                        x1, y1, x2, y2 = xyxys[i]
-                        conf = float(confs[i])
-                        cls = int(clss[i])
-                        label = result.names[cls]
-
-                        bb_id = str(uuid.uuid4())
-                        record = Detection(
-                            id=bb_id,
-                            page_id=page_id,
-                            project_id=project_id,
-                            class_name=label,
-                            confidence=conf,
-                            bbox_x1=float(x1),
-                            bbox_y1=float(y1),
-                            bbox_x2=float(x2),
-                            bbox_y2=float(y2),
-                            is_manual=False,
-                            is_edited=False,
-                        )
-                        self.db.add(record)
-
-                        bounding_boxes.append({
-                            "id": bb_id,
-                            "x1": float(x1),
-                            "y1": float(y1),
-                            "x2": float(x2),
-                            "y2": float(y2),
-                            "label": label,
-                            "confidence": conf,
-                            "is_manual": False,
-                            "is_edited": False,
-                        })
-
-            return bounding_boxes
+        for det in detections:
+            bb_id = str(uuid.uuid4())
+
+            record = Detection(
+                id=bb_id,
+                page_id=page_id,
+                project_id=project_id,
+                class_name=det['class_name'],
+                confidence=det['confidence'],
+                bbox_x1=det['bbox_x1'],
+                bbox_y1=det['bbox_y1'],
+                bbox_x2=det['bbox_x2'],
+                bbox_y2=det['bbox_y2'],
+                is_manual=False,
+                is_edited=False,
+            )
+            self.db.add(record)
+
+            bounding_boxes.append({
+                "id": bb_id,
+                "x1": det['bbox_x1'],
+                "y1": det['bbox_y1'],
+                "x2": det['bbox_x2'],
+                "y2": det['bbox_y2'],
+                "label": det['class_name'],
+                "confidence": det['confidence'],
+                "is_manual": False,
+                "is_edited": False,
+            })
 
+        return bounding_boxes
+
+    def infer_detections(
+        self,
+        page_id: str,
+        project_id: str,
+        image: Image.Image,
+        use_tiling: bool = True,
+        tile_ids: list = None,
+    ):
+        """Run the model on a page image and return raw detections (nothing is saved)"""
+        try:
+            if use_tiling:
+                return run_inference(image, use_tiling=True, confidence=0.25, tile_ids=tile_ids)
+            return run_inference(image, use_tiling=False)
+        except InferenceError as e:
+            logger.error("Inference unavailable for page_id=%s: %s", page_id, e.message)
+            raise HTTPException(status_code=e.status_code, detail=e.message)
         except Exception as e:
             logger.exception(
-                "YOLO inference failed for page_id=%s project_id=%s",
+                "%s YOLO inference failed for page_id=%s project_id=%s",
+                "Tiled" if use_tiling else "Full-image",
                 page_id,
                 project_id,
             )
-            raise HTTPException(status_code=500, detail=f"AI detection failed: {type(e).__name__}")
+            prefix = "Tiled AI detection" if use_tiling else "AI detection"
+            raise HTTPException(status_code=500, detail=f"{prefix} failed: {type(e).__name__}")
+
+    def generate_detections(self, page_id: str, project_id: str, image: Image.Image):
+        detections = self.infer_detections(page_id, project_id, image, use_tiling=False)
+        return self.save_detections(page_id, project_id, detections)
 
     def generate_detections_tiled(self, page_id: str, project_id: str, image: Image.Image):
         """
@@ -346,58 +501,18 @@ class PDFService(BaseService):
         Returns:
             List of bounding boxes
         """
-        try:
-            # Initialize tiled detection service
-            tiled_service = TiledDetectionService(MODEL_PATH)
-            
-            # Run tiled detection
-            detections = tiled_service.detect_with_tiling(image, confidence=0.25)
-            
-            bounding_boxes = []
-            
-            # Save detections to database
-            for det in detections:
-                bb_id = str(uuid.uuid4())
-                
-                record = Detection(
-                    id=bb_id,
-                    page_id=page_id,
-                    project_id=project_id,
-                    class_name=det['class_name'],
-                    confidence=det['confidence'],
-                    bbox_x1=det['bbox_x1'],
-                    bbox_y1=det['bbox_y1'],
-                    bbox_x2=det['bbox_x2'],
-                    bbox_y2=det['bbox_y2'],
-                    is_manual=False,
-                    is_edited=False,
-                )
-                self.db.add(record)
-                
-                bounding_boxes.append({
-                    "id": bb_id,
-                    "x1": det['bbox_x1'],
-                    "y1": det['bbox_y1'],
-                    "x2": det['bbox_x2'],
-                    "y2": det['bbox_y2'],
-                    "label": det['class_name'],
-                    "confidence": det['confidence'],
-                    "is_manual": False,
-                    "is_edited": False,
-                })
-            
-            logger.info(f"✅ Tiled detection completed: {len(bounding_boxes)} detections")
-            return bounding_boxes
-            
-        except Exception as e:
-            logger.exception(
-                "Tiled YOLO inference failed for page_id=%s project_id=%s",
-                page_id,
-                project_id,
-            )
-            raise HTTPException(status_code=500, detail=f"Tiled AI detection failed: {type(e).__name__}")
+        detections = self.infer_detections(page_id, project_id, image, use_tiling=True)
+        bounding_boxes = self.save_detections(page_id, project_id, detections)
+        logger.info(f"✅ Tiled detection completed: {len(bounding_boxes)} detections")
+        return bounding_boxes
 
-    def get_project_pages(self, project_id: str):
+    def get_project_pages(self, project_id: str, columnar: bool = False):
+        """
+        Pages of a project with their bounding boxes.
+
+        With `columnar`, each page's boxes are parallel arrays indexing one
+        project-wide class table (see detection_encoding).
+        """
         project = self.db.query(Project).filter(Project.id == project_id).first()
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -409,29 +524,25 @@ class PDFService(BaseService):
             .all()
         )
 
+        # One query for every box of the project, read as plain tuples
+        boxes_by_page = {}
+        rows = (
+            self.db.query(Detection.page_id, *BOX_COLUMNS)
+            .filter(Detection.project_id == project_id)
+            .all()
+        )
+        for page_id, *values in rows:
+            boxes_by_page.setdefault(page_id, []).append(values)
+
+        class_index = {}
         page_data = []
 
         for page in pages:
-            detections = (
-                self.db.query(Detection)
-                .filter(Detection.page_id == page.id)
-                .all()
-            )
-
-            bounding_boxes = [
-                {
-                    "id": d.id,
-                    "x1": d.bbox_x1,
-                    "y1": d.bbox_y1,
-                    "x2": d.bbox_x2,
-                    "y2": d.bbox_y2,
-                    "label": d.class_name,
-                    "confidence": d.confidence,
-                    "is_manual": d.is_manual,
-                    "is_edited": d.is_edited,
-                }
-                for d in detections
-            ]
+            boxes = boxes_by_page.get(page.id, [])
+            if columnar:
+                bounding_boxes = encode_columnar(boxes, class_index)
+            else:
+                bounding_boxes = boxes_to_dicts(boxes)
 
             page_data.append({
                 "page_id": page.id,
@@ -439,20 +550,18 @@ class PDFService(BaseService):
                 "image_url": page.image_url,
                 "width": page.width,
                 "height": page.height,
+                "thumbnail_url": page.thumbnail_url,
+                "preview_url": page.preview_url,
+                "pyramid": page.pyramid,
                 "bounding_boxes": bounding_boxes,
             })
 
-        return {
+        payload = {
             "project_id": project_id,
             "pages": page_data,
             "pageCount": len(page_data),
         }
-
-def get_model_status():
-    return {
-        "model_loaded": ai_model is not None,
-        "model_path": MODEL_PATH,
-        "model_exists": os.path.exists(MODEL_PATH),
-        "model_task": MODEL_TASK or "auto",
-        "error": MODEL_LOAD_ERROR,
-    }
+        if columnar:
+            payload["format"] = "columnar"
+            payload["classes"] = list(class_index)
+        return payload
@@ -88,6 +88,9 @@ class ProjectService(BaseService):
                 "image_url": p.image_url,
                 "width": p.width,
                 "height": p.height,
+                "thumbnail_url": p.thumbnail_url,
+                "preview_url": p.preview_url,
+                "pyramid": p.pyramid,
             }
             for p in pages
         ]
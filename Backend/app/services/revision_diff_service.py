@@ -0,0 +1,127 @@
+"""
+Revision Diffing
+
+Compares a page raster with the previous revision of the same sheet so
+that only changed tiles go through the model. Each detected page keeps
+a small fingerprint (the page in grayscale, box-downsampled); two
+fingerprints are differenced per tile, and detections of the previous
+revision are carried over for every tile that did not change.
+"""
+import io
+import os
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from app.services.image_probe import LazyImage
+from app.services.tiled_detection_service import TiledDetectionService
+
+logger = logging.getLogger(__name__)
+
+# Page pixels per fingerprint pixel along each axis
+REVISION_FINGERPRINT_SCALE = int(os.getenv("REVISION_FINGERPRINT_SCALE", "8"))
+# Gray-level difference that counts as a changed fingerprint pixel
+REVISION_DIFF_THRESHOLD = int(os.getenv("REVISION_DIFF_THRESHOLD", "40"))
+# Changed fingerprint pixels needed before a tile is re-detected
+REVISION_MIN_CHANGED_PIXELS = int(os.getenv("REVISION_MIN_CHANGED_PIXELS", "3"))
+
+
+def compute_fingerprint(image) -> np.ndarray:
+    """Grayscale page reduced by REVISION_FINGERPRINT_SCALE (box average)"""
+    if isinstance(image, LazyImage):
+        image = image.image
+    elif isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    if image.mode != "L":
+        image = image.convert("L")
+    return np.asarray(image.reduce(REVISION_FINGERPRINT_SCALE))
+
+
+def pack_fingerprint(fingerprint: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, fingerprint=fingerprint)
+    return buffer.getvalue()
+
+
+def unpack_fingerprint(data: bytes) -> np.ndarray:
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        return npz["fingerprint"]
+
+
+def changed_tiles(previous: np.ndarray, current: np.ndarray, bounds: List[Dict]) -> List[Dict]:
+    """Tiles (from TiledDetectionService.tile_bounds) whose content differs"""
+    if previous.shape != current.shape:
+        return list(bounds)
+
+    changed = np.abs(previous.astype(np.int16) - current.astype(np.int16)) > REVISION_DIFF_THRESHOLD
+    scale = REVISION_FINGERPRINT_SCALE
+
+    result = []
+    for bound in bounds:
+        x0, y0, x1, y1 = bound['box']
+        region = changed[y0 // scale:-(-y1 // scale), x0 // scale:-(-x1 // scale)]
+        if np.count_nonzero(region) >= REVISION_MIN_CHANGED_PIXELS:
+            result.append(bound)
+    return result
+
+
+def _intersects(det: Dict, box: tuple) -> bool:
+    x0, y0, x1, y1 = box
+    return not (
+        det['bbox_x2'] <= x0 or det['bbox_x1'] >= x1
+        or det['bbox_y2'] <= y0 or det['bbox_y1'] >= y1
+    )
+
+
+def merge_revision(
+    previous_detections: List[Dict],
+    new_detections: List[Dict],
+    changed: List[Dict],
+    tiler: TiledDetectionService,
+) -> List[Dict]:
+    """
+    Keep previous detections that touch no changed tile, add the fresh
+    detections of the changed tiles, and run NMS across the seam.
+    """
+    kept = [
+        det for det in previous_detections
+        if not any(_intersects(det, bound['box']) for bound in changed)
+    ]
+
+    merged = [
+        {**det, '_abs_coords': [det['bbox_x1'], det['bbox_y1'], det['bbox_x2'], det['bbox_y2']]}
+        for det in kept + list(new_detections)
+    ]
+    return tiler._merge_detections_nms(merged)
+
+
+def plan_incremental(previous_asset, image: LazyImage, fingerprint: np.ndarray, cache_key: str) -> Optional[Dict]:
+    """
+    Decide whether a page can be re-detected incrementally.
+
+    Returns:
+        None to run full detection, else a dict with 'tiler', 'bounds' and
+        'changed' (the tiles that need inference)
+    """
+    if (
+        previous_asset is None
+        or previous_asset.fingerprint is None
+        or previous_asset.detections is None
+        or previous_asset.detections_key != cache_key
+    ):
+        return None
+
+    tiler = TiledDetectionService(load_model=False)
+    bounds = tiler.tile_bounds(image.width, image.height)
+    # A resized sheet differs everywhere (changed_tiles compares shapes)
+    changed = changed_tiles(unpack_fingerprint(previous_asset.fingerprint), fingerprint, bounds)
+    if len(changed) == len(bounds):
+        return None
+
+    logger.info(
+        "Revision diff vs %s: %d of %d tiles changed",
+        previous_asset.content_hash[:12], len(changed), len(bounds),
+    )
+    return {"tiler": tiler, "bounds": bounds, "changed": changed}
@@ -0,0 +1,174 @@
+"""
+Shared-Memory Page Images
+
+Moves decoded page rasters between the API and the inference server
+without pickling or re-encoding. The page array is written once into a
+POSIX shared memory block; the receiving process attaches to it by name
+and works on numpy views, so tiles are just offsets into the same buffer.
+
+Bilevel (1-bit) pages stay packed at 8 pixels per byte end to end and are
+only unpacked one tile at a time.
+"""
+import logging
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.services.image_probe import LazyImage
+
+logger = logging.getLogger(__name__)
+
+# Pixel layouts numpy can view directly; anything else (P, CMYK...) is converted
+_ARRAY_MODES = ("L", "RGB", "RGBA")
+
+
+class PackedBilevel:
+    """
+    A 1-bit page packed 8 pixels per byte (MSB first, rows padded to a
+    byte), the same layout as PIL's mode "1" raw data.
+
+    Slicing `page[y0:y1, x0:x1]` returns that region unpacked to a uint8
+    grayscale array (0 / 255), so tiling code treats it like any H x W array.
+    """
+
+    def __init__(self, packed: np.ndarray, width: int):
+        self.packed = packed
+        self.width = width
+        self.height = packed.shape[0]
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "PackedBilevel":
+        width, height = image.size
+        packed = np.frombuffer(image.tobytes(), dtype=np.uint8)
+        return cls(packed.reshape(height, (width + 7) // 8), width)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    @property
+    def nbytes(self) -> int:
+        return self.packed.nbytes
+
+    def __getitem__(self, key) -> np.ndarray:
+        rows, cols = key
+        y0, y1, _ = rows.indices(self.height)
+        x0, x1, _ = cols.indices(self.width)
+        first_byte = x0 // 8
+        last_byte = (x1 + 7) // 8
+        bits = np.unpackbits(self.packed[y0:y1, first_byte:last_byte], axis=1)
+        start = x0 - first_byte * 8
+        return bits[:, start:start + (x1 - x0)] * np.uint8(255)
+
+    def to_image(self) -> Image.Image:
+        return Image.frombytes("1", (self.width, self.height), self.packed.tobytes())
+
+
+def as_pixel_array(image):
+    """
+    Return a uint8 H x W (x C) array for a PIL image or array, without
+    copying arrays. 1-bit images come back as a PackedBilevel.
+    """
+    if isinstance(image, (np.ndarray, PackedBilevel)):
+        return image
+    if isinstance(image, LazyImage):
+        image = image.image
+    if image.mode == "1":
+        return PackedBilevel.from_image(image)
+    if image.mode not in _ARRAY_MODES:
+        image = image.convert("RGB")
+    return np.asarray(image)
+
+
+class SharedImage:
+    """A page array backed by a named shared memory block."""
+
+    def __init__(
+        self,
+        shm: SharedMemory,
+        shape: Tuple[int, ...],
+        dtype: str,
+        owner: bool,
+        bilevel_width: Optional[int] = None,
+    ):
+        self._shm = shm
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+        self.bilevel_width = bilevel_width
+        self._buffer = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+        self.array = (
+            PackedBilevel(self._buffer, bilevel_width)
+            if bilevel_width else self._buffer
+        )
+
+    @classmethod
+    def create(cls, image) -> "SharedImage":
+        """Copy a decoded image into a new shared memory block (the only copy made)."""
+        source = as_pixel_array(image)
+        bilevel_width = None
+        if isinstance(source, PackedBilevel):
+            bilevel_width = source.width
+            source = source.packed
+        shm = SharedMemory(create=True, size=max(source.nbytes, 1))
+        shared = cls(shm, source.shape, source.dtype.str, owner=True, bilevel_width=bilevel_width)
+        shared._buffer[...] = source
+        return shared
+
+    @classmethod
+    def attach(cls, descriptor: Dict) -> "SharedImage":
+        """Map a block created by another process."""
+        shm = SharedMemory(name=descriptor["name"])
+        # The creator owns the block; stop this process's tracker from
+        # unlinking it (and warning about a "leak") at exit
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return cls(
+            shm,
+            descriptor["shape"],
+            descriptor["dtype"],
+            owner=False,
+            bilevel_width=descriptor.get("bilevel_width"),
+        )
+
+    def descriptor(self) -> Dict:
+        """Picklable handle another process can attach with."""
+        return {
+            "name": self._shm.name,
+            "shape": self.shape,
+            "dtype": self.dtype.str,
+            "bilevel_width": self.bilevel_width,
+        }
+
+    def view(self, offset: Tuple[int, int], size: Tuple[int, int]) -> np.ndarray:
+        """Zero-copy view of a region given its (x, y) offset and (width, height)."""
+        x, y = offset
+        w, h = size
+        return self.array[y:y + h, x:x + w]
+
+    def close(self):
+        # Views must be released before the buffer can be unmapped
+        self.array = None
+        self._buffer = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # A consumer (e.g. the YOLO predictor's last batch) still holds a
+            # view; the mapping is released once that reference goes away
+            logger.debug("Shared image %s still referenced; deferring unmap", self._shm.name)
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
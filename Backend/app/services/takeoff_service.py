@@ -0,0 +1,72 @@
+from decimal import Decimal
+from typing import Dict, Any
+from fastapi import HTTPException
+
+from app.models.projects import Project
+from app.models.takeoff_totals import ProjectClassTotal, ProjectSectionTotal
+from app.services.base import BaseService
+
+
+class TakeoffService(BaseService):
+    """Quantity takeoff summaries read from the trigger-maintained totals"""
+
+    def get_takeoff(self, project_id: str) -> Dict[str, Any]:
+        """
+        Counts per class and quantities / costs per section for a project.
+
+        Reads one row per class and per section, never the detections or
+        components themselves.
+        """
+        if not self.db.query(Project.id).filter(Project.id == project_id).first():
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        class_rows = (
+            self.db.query(ProjectClassTotal)
+            .filter(
+                ProjectClassTotal.project_id == project_id,
+                (ProjectClassTotal.detection_count != 0) | (ProjectClassTotal.component_count != 0),
+            )
+            .order_by(ProjectClassTotal.class_name)
+            .all()
+        )
+        section_rows = (
+            self.db.query(ProjectSectionTotal)
+            .filter(
+                ProjectSectionTotal.project_id == project_id,
+                ProjectSectionTotal.component_count != 0,
+            )
+            .order_by(ProjectSectionTotal.section, ProjectSectionTotal.boq_code)
+            .all()
+        )
+
+        classes = [
+            {
+                "class_name": row.class_name,
+                "detection_count": row.detection_count,
+                "component_count": row.component_count,
+                "quantity": row.quantity,
+            }
+            for row in class_rows
+        ]
+        sections = [
+            {
+                "section": row.section or None,
+                "boq_code": row.boq_code or None,
+                "component_count": row.component_count,
+                "quantity": row.quantity,
+                "total_cost": row.total_cost,
+            }
+            for row in section_rows
+        ]
+
+        return {
+            "project_id": project_id,
+            "classes": classes,
+            "sections": sections,
+            "totals": {
+                "detection_count": sum(c["detection_count"] for c in classes),
+                "component_count": sum(c["component_count"] for c in classes),
+                "quantity": sum(c["quantity"] for c in classes),
+                "total_cost": sum((s["total_cost"] for s in sections), Decimal("0")),
+            },
+        }
@@ -5,37 +5,14 @@ Handles YOLO inference on large images by splitting into tiles,
 detecting on each tile, and merging results with NMS.
 """
 import numpy as np
-import torch
+from functools import partial
 from typing import List, Tuple, Dict
-import cv2
 from PIL import Image
 import logging
 
-logger = logging.getLogger(__name__)
-
-# Patch torch.load to support older YOLO models (PyTorch 2.6 compatibility)
-_original_load = torch.load
-def safe_load(*args, **kwargs):
-    if "weights_only" not in kwargs:
-        kwargs["weights_only"] = False
-    return _original_load(*args, **kwargs)
-torch.load = safe_load
-
-from ultralytics import YOLO
-from ultralytics.nn.modules.head import Detect, OBB, Pose, Segment
-
+from app.services.shared_image import as_pixel_array
 
-def _patch_yolo_heads(model):
-    """Patch older OBB/Segment/Pose heads missing the `detect` attribute."""
-    torch_model = getattr(model, "model", None)
-    if torch_model is None:
-        return False
-    patched = False
-    for module in torch_model.modules():
-        if isinstance(module, (OBB, Segment, Pose)) and not hasattr(module, "detect"):
-            module.detect = Detect.forward
-            patched = True
-    return patched
+logger = logging.getLogger(__name__)
 
 
 class TiledDetectionService:
@@ -44,19 +21,31 @@ class TiledDetectionService:
     detecting on each tile, and merging results with NMS.
     """
     
-    def __init__(self, model_path: str = "best.pt"):
-        """Initialize YOLO model"""
-        try:
-            self.model = YOLO(model_path)
-            
-            # Patch YOLO heads for compatibility
-            if _patch_yolo_heads(self.model):
-                logger.info("✅ Patched YOLO head modules missing 'detect' attribute.")
-            
-            logger.info(f"✅ Tiled detection model loaded: {model_path}")
-        except Exception as e:
-            logger.error(f"❌ Failed to load model: {e}")
-            self.model = None
+    def __init__(self, model_path: str = "best.pt", model=None, batcher=None, load_model: bool = True):
+        """
+        Initialize YOLO model.
+
+        Args:
+            model_path: Weights file to load when no model is given
+            model: Already-loaded YOLO model to reuse (skips loading)
+            batcher: Optional MicroBatcher that runs tiles instead of the model
+            load_model: False for tile geometry / NMS only (no model at all)
+        """
+        self.batcher = batcher
+        if batcher is not None:
+            self.model = batcher.model
+        elif model is not None or not load_model:
+            self.model = model
+        else:
+            try:
+                # Deferred import keeps torch/ultralytics out of module import
+                from app.services.model_registry import load_yolo
+
+                self.model = load_yolo(model_path)
+                logger.info(f"✅ Tiled detection model loaded: {model_path}")
+            except Exception as e:
+                logger.error(f"❌ Failed to load model: {e}")
+                self.model = None
         
         # Configuration
         self.tile_grid = (2, 4)  # 2 rows x 4 columns = 8 tiles
@@ -68,14 +57,16 @@ class TiledDetectionService:
     def detect_with_tiling(
         self, 
         image: Image.Image,
-        confidence: float = None
+        confidence: float = None,
+        tile_ids: List[str] = None
     ) -> List[Dict]:
         """
         Main method: Split image into tiles, detect, and merge results.
         
         Args:
-            image: PIL Image object
+            image: PIL Image object or numpy array (e.g. a shared-memory view)
             confidence: Detection confidence threshold (optional)
+            tile_ids: Only run these tiles (see tile_bounds); default all
             
         Returns:
             List of detections with pixel coordinates matching YOLO output format
@@ -85,40 +76,50 @@ class TiledDetectionService:
         
         conf_threshold = confidence or self.confidence_threshold
         
-        # Convert PIL to numpy array (OpenCV format)
-        image_np = np.array(image)
-        if len(image_np.shape) == 2:  # Grayscale
-            image_np = cv2.cvtColor(image_np, cv2.COLOR_GRAY2RGB)
-        elif image_np.shape[2] == 4:  # RGBA
-            image_np = cv2.cvtColor(image_np, cv2.COLOR_RGBA2RGB)
+        # View the pixels without copying; colour conversion happens per tile
+        image_np = as_pixel_array(image)
         
         img_height, img_width = image_np.shape[:2]
         
-        # Step 1: Generate tiles with overlap
-        tiles = self._generate_tiles(image_np, img_width, img_height)
+        # Step 1: Tile geometry only; pixels are sliced per tile below
+        tiles = self.tile_bounds(img_width, img_height)
+        if tile_ids is not None:
+            wanted = set(tile_ids)
+            tiles = [t for t in tiles if t['tile_id'] in wanted]
         
         logger.info(f"🔲 Generated {len(tiles)} tiles from {img_width}x{img_height} image")
         
         # Step 2: Run inference on each tile
+        if self.batcher is not None:
+            # Queue every tile up front so they can share batches with
+            # tiles from other concurrent requests; each tile is sliced and
+            # converted only when its batch is assembled
+            futures = [
+                self.batcher.submit(partial(self._tile_input, image_np, tile_info['box']), conf_threshold)
+                for tile_info in tiles
+            ]
+            tile_results = [future.result() for future in futures]
+        else:
+            tile_results = [
+                self.model(
+                    self._tile_input(image_np, tile_info['box']),
+                    conf=conf_threshold,
+                    verbose=False
+                )[0]
+                for tile_info in tiles
+            ]
+        
         all_detections = []
         
-        for tile_info in tiles:
-            tile_image = tile_info['image']
-            tile_offset = tile_info['offset']  # (x_offset, y_offset)
-            
-            # Run YOLO on this tile
-            results = self.model(
-                tile_image,
-                conf=conf_threshold,
-                verbose=False
-            )
-            
+        for tile_info, result in zip(tiles, tile_results):
             # Convert to absolute coordinates in original image
+            x_start, y_start = tile_info['box'][:2]
             tile_detections = self._process_tile_results(
-                results[0],
-                tile_offset,
+                result,
+                (x_start, y_start),
                 img_width,
-                img_height
+                img_height,
+                min_confidence=conf_threshold
             )
             
             all_detections.extend(tile_detections)
@@ -133,17 +134,16 @@ class TiledDetectionService:
         return merged_detections
     
     
-    def _generate_tiles(
-        self, 
-        image: np.ndarray,
+    def tile_bounds(
+        self,
         img_width: int,
         img_height: int
     ) -> List[Dict]:
         """
-        Split image into overlapping tiles.
+        Compute overlapping tile rectangles for an image size.
         
         Returns:
-            List of dicts with 'image' and 'offset' (x, y)
+            List of dicts with 'tile_id' and 'box' (x_start, y_start, x_end, y_end)
         """
         rows, cols = self.tile_grid
         
@@ -154,7 +154,7 @@ class TiledDetectionService:
         overlap_x = int(tile_width * self.overlap_ratio)
         overlap_y = int(tile_height * self.overlap_ratio)
         
-        tiles = []
+        bounds = []
         
         for row in range(rows):
             for col in range(cols):
@@ -165,16 +165,46 @@ class TiledDetectionService:
                 x_end = min(img_width, (col + 1) * tile_width + overlap_x)
                 y_end = min(img_height, (row + 1) * tile_height + overlap_y)
                 
-                # Extract tile
-                tile_image = image[y_start:y_end, x_start:x_end]
-                
-                tiles.append({
-                    'image': tile_image,
-                    'offset': (x_start, y_start),
-                    'tile_id': f"tile_{row}_{col}"
+                bounds.append({
+                    'tile_id': f"tile_{row}_{col}",
+                    'box': (x_start, y_start, x_end, y_end)
                 })
         
-        return tiles
+        return bounds
+    
+    
+    def tile_shapes(self, img_width: int, img_height: int) -> set:
+        """Distinct (height, width) tile shapes produced for an image size."""
+        return {
+            (y_end - y_start, x_end - x_start)
+            for x_start, y_start, x_end, y_end in (
+                b['box'] for b in self.tile_bounds(img_width, img_height)
+            )
+        }
+    
+    
+    def _tile_input(self, image, box: Tuple[int, int, int, int]) -> np.ndarray:
+        """
+        Slice one tile and convert it to model input.
+        
+        On an ndarray (including shared memory) the slice is a view; a
+        PackedBilevel page is unpacked here for this tile only, so a page
+        is never unpacked or expanded to RGB as a whole.
+        """
+        x_start, y_start, x_end, y_end = box
+        return self._to_rgb(image[y_start:y_end, x_start:x_end])
+    
+    
+    @staticmethod
+    def _to_rgb(tile: np.ndarray) -> np.ndarray:
+        """Expand a grayscale/RGBA tile to the 3-channel input the model expects."""
+        if tile.ndim == 2:  # Grayscale
+            import cv2
+            return cv2.cvtColor(tile, cv2.COLOR_GRAY2RGB)
+        if tile.shape[2] == 4:  # RGBA
+            import cv2
+            return cv2.cvtColor(tile, cv2.COLOR_RGBA2RGB)
+        return tile
     
     
     def _process_tile_results(
@@ -182,7 +212,8 @@ class TiledDetectionService:
         result,
         tile_offset: Tuple[int, int],
         img_width: int,
-        img_height: int
+        img_height: int,
+        min_confidence: float = 0.0
     ) -> List[Dict]:
         """
         Convert tile detections to original image coordinates (pixels).
@@ -192,6 +223,8 @@ class TiledDetectionService:
             tile_offset: (x_offset, y_offset) of tile in original image
             img_width: Original image width
             img_height: Original image height
+            min_confidence: Drop boxes below this (batches run at the lowest
+                threshold of the requests they contain)
             
         Returns:
             List of detections with pixel coordinates
@@ -203,6 +236,9 @@ class TiledDetectionService:
             return detections
         
         for box in result.boxes:
+            if float(box.conf[0]) < min_confidence:
+                continue
+            
             # Get box in tile coordinates (pixels)
             x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
             
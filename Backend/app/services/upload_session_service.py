@@ -0,0 +1,229 @@
+"""
+Resumable Upload Sessions
+
+Large drawing sets are uploaded as a sequence of chunks written straight
+to local disk. Each session is a directory holding the partial file and a
+small JSON state file, so any API worker on the host can continue a
+session and a dropped connection resumes from the last stored offset.
+"""
+import os
+import json
+import time
+import uuid
+import fcntl
+import shutil
+import hashlib
+from contextlib import contextmanager
+from typing import Dict, AsyncIterator
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.upload_spool import UPLOAD_SPOOL_DIR, MAX_PDF_SIZE
+from app.services.page_asset_service import hash_file
+
+UPLOAD_SESSION_DIR = os.path.join(UPLOAD_SPOOL_DIR, "upload_sessions")
+# Sessions untouched for this long are removed
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+class UploadSessionService:
+    """Disk-backed state for chunked, resumable PDF uploads"""
+
+    def __init__(self, base_dir: str = UPLOAD_SESSION_DIR):
+        self.base_dir = base_dir
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    # =====================
+    # PATHS & STATE
+    # =====================
+
+    def _session_dir(self, upload_id: str) -> str:
+        # upload_id comes from the URL; only accept ids we could have issued
+        try:
+            uuid.UUID(upload_id)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        return os.path.join(self.base_dir, upload_id)
+
+    def data_path(self, upload_id: str) -> str:
+        return os.path.join(self._session_dir(upload_id), "data.pdf")
+
+    def _state_path(self, upload_id: str) -> str:
+        return os.path.join(self._session_dir(upload_id), "state.json")
+
+    def _write_state(self, state: Dict) -> None:
+        path = self._state_path(state["upload_id"])
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def get(self, upload_id: str, project_id: str = None) -> Dict:
+        try:
+            with open(self._state_path(upload_id)) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Upload session not found")
+
+        if project_id and state["project_id"] != project_id:
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        return state
+
+    @contextmanager
+    def _locked(self, upload_id: str):
+        """Allow one writer per session across requests and workers"""
+        lock_path = os.path.join(self._session_dir(upload_id), ".lock")
+        if not os.path.exists(os.path.dirname(lock_path)):
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        with open(lock_path, "w") as lock_file:
+            # Never block the event loop waiting on another request
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise HTTPException(status_code=409, detail="Another request is writing this upload")
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _ensure_open(state: Dict) -> None:
+        if state.get("status") == "completing":
+            raise HTTPException(status_code=409, detail="Upload is already being completed")
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - UPLOAD_SESSION_TTL
+        for name in os.listdir(self.base_dir):
+            path = os.path.join(self.base_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except FileNotFoundError:
+                pass
+
+    # =====================
+    # SESSION LIFECYCLE
+    # =====================
+
+    def create(self, project_id: str, filename: str, total_size: int, sha256: str = None) -> Dict:
+        if total_size <= 0:
+            raise HTTPException(status_code=400, detail="total_size must be positive")
+        if total_size > MAX_PDF_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File size too large. Max {MAX_PDF_SIZE // (1024 * 1024)}MB allowed"
+            )
+
+        self._purge_expired()
+
+        upload_id = str(uuid.uuid4())
+        os.makedirs(self._session_dir(upload_id))
+        open(self.data_path(upload_id), "wb").close()
+
+        state = {
+            "upload_id": upload_id,
+            "project_id": project_id,
+            "filename": filename,
+            "total_size": total_size,
+            "sha256": sha256.lower() if sha256 else None,
+            "offset": 0,
+            "status": "open",
+            "created_at": time.time(),
+        }
+        self._write_state(state)
+        return state
+
+    async def write_chunk(
+        self,
+        upload_id: str,
+        project_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        chunk_sha256: str = None,
+    ) -> Dict:
+        """
+        Append one chunk at `offset`, which must equal the bytes stored so far.
+
+        The chunk is streamed to disk; if its checksum does not match, the
+        file is truncated back so the client can simply resend it. Disk
+        writes run in the threadpool so large chunks never stall the loop.
+        """
+        with self._locked(upload_id):
+            state = self.get(upload_id, project_id)
+            self._ensure_open(state)
+            if offset != state["offset"]:
+                raise HTTPException(
+                    status_code=409,
+                    detail={"message": "Offset mismatch", "offset": state["offset"]},
+                )
+
+            hasher = hashlib.sha256()
+            written = 0
+            f = await run_in_threadpool(open, self.data_path(upload_id), "r+b")
+            try:
+                f.seek(offset)
+                try:
+                    async for data in chunks:
+                        written += len(data)
+                        if written > MAX_CHUNK_SIZE or offset + written > state["total_size"]:
+                            raise HTTPException(status_code=413, detail="Chunk exceeds declared upload size")
+                        hasher.update(data)
+                        await run_in_threadpool(f.write, data)
+
+                    if chunk_sha256 and hasher.hexdigest() != chunk_sha256.lower():
+                        raise HTTPException(status_code=422, detail="Chunk checksum mismatch")
+                except BaseException:
+                    await run_in_threadpool(f.truncate, offset)
+                    raise
+                await run_in_threadpool(f.truncate, offset + written)
+            finally:
+                await run_in_threadpool(f.close)
+
+            state["offset"] = offset + written
+            await run_in_threadpool(self._write_state, state)
+
+        return state
+
+    def complete(self, upload_id: str, project_id: str) -> Dict:
+        """
+        Verify the assembled file and return its path and SHA-256.
+
+        The session is marked as completing, so a second complete, a late
+        chunk or an abort cannot touch the file while it is converted.
+        """
+        with self._locked(upload_id):
+            state = self.get(upload_id, project_id)
+            self._ensure_open(state)
+            if state["offset"] != state["total_size"]:
+                raise HTTPException(
+                    status_code=409,
+                    detail={"message": "Upload incomplete", "offset": state["offset"]},
+                )
+
+            path = self.data_path(upload_id)
+            sha256 = hash_file(path)
+            if state["sha256"] and sha256 != state["sha256"]:
+                raise HTTPException(status_code=422, detail="File checksum mismatch")
+
+            state["status"] = "completing"
+            self._write_state(state)
+
+        return {**state, "path": path, "sha256": sha256}
+
+    def reopen(self, upload_id: str) -> None:
+        """Return a session whose conversion failed to open, so complete can be retried"""
+        with self._locked(upload_id):
+            state = self.get(upload_id)
+            state["status"] = "open"
+            self._write_state(state)
+
+    def abort(self, upload_id: str, project_id: str) -> None:
+        """Discard an upload unless it is being completed"""
+        with self._locked(upload_id):
+            self._ensure_open(self.get(upload_id, project_id))
+            self.delete(upload_id)
+
+    def delete(self, upload_id: str) -> None:
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
@@ -0,0 +1,73 @@
+"""
+Upload Spooling
+
+Streams uploaded files to a temp file in fixed-size chunks, hashing and
+enforcing the size limit as the bytes arrive, so an upload is never held
+in worker memory.
+"""
+import os
+import hashlib
+import tempfile
+from dataclasses import dataclass
+
+from fastapi import UploadFile, HTTPException
+
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or tempfile.gettempdir()
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_PDF_SIZE = 500 * 1024 * 1024
+
+
+@dataclass
+class SpooledUpload:
+    """An upload written to local disk."""
+    path: str
+    size: int
+    sha256: str
+
+    def cleanup(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: int = MAX_PDF_SIZE,
+    suffix: str = "",
+) -> SpooledUpload:
+    """
+    Copy an UploadFile to disk chunk by chunk.
+
+    Raises:
+        HTTPException(400) as soon as the upload exceeds max_bytes
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=UPLOAD_SPOOL_DIR)
+    hasher = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File size too large. Max {max_bytes // (1024 * 1024)}MB allowed"
+                    )
+                hasher.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    return SpooledUpload(path=path, size=size, sha256=hasher.hexdigest())
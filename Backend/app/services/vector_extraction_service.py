@@ -0,0 +1,256 @@
+"""
+PDF Text & Vector Extraction
+
+Reads the embedded text (tags, CFM notes, schedules) and line geometry
+of each PDF page with PyMuPDF, so they can be searched and matched to
+detections without OCR. Results are stored per page raster as compressed
+column arrays:
+
+    words:    text, x1, y1, x2, y2, block, line
+    segments: x1, y1, x2, y2, width
+
+PyMuPDF is optional; without it ingestion simply skips this stage.
+"""
+import io
+import os
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import or_
+
+from app.services.base import BaseService
+from app.models.pages import Page
+from app.models.page_vectors import PageVector
+
+logger = logging.getLogger(__name__)
+
+PDF_EXTRACT_VECTORS = os.getenv("PDF_EXTRACT_VECTORS", "true").lower() in ("1", "true", "yes")
+
+WORD_COLUMNS = ("text", "x1", "y1", "x2", "y2", "block", "line")
+SEGMENT_COLUMNS = ("x1", "y1", "x2", "y2", "width")
+
+
+def _import_fitz():
+    try:
+        import fitz
+    except ImportError:
+        return None
+    return fitz
+
+
+def vectors_available() -> bool:
+    return PDF_EXTRACT_VECTORS and _import_fitz() is not None
+
+
+def _page_segments(page, matrix) -> List[tuple]:
+    """Straight segments of a page's drawings; curves become their chord"""
+    segments = []
+    for path in page.get_drawings():
+        width = path.get("width") or 0.0
+        for item in path["items"]:
+            kind = item[0]
+            if kind == "l":
+                points = [item[1], item[2]]
+            elif kind == "c":
+                points = [item[1], item[4]]
+            elif kind == "re":
+                rect = item[1]
+                points = [rect.tl, rect.tr, rect.br, rect.bl, rect.tl]
+            elif kind == "qu":
+                quad = item[1]
+                points = [quad.ul, quad.ur, quad.lr, quad.ll, quad.ul]
+            else:
+                continue
+            points = [p * matrix for p in points]
+            for a, b in zip(points, points[1:]):
+                segments.append((a.x, a.y, b.x, b.y, width))
+    return segments
+
+
+def extract_page_columns(page, scale: float) -> Dict[str, np.ndarray]:
+    """
+    Words and segments of one PyMuPDF page in raster pixel coordinates.
+
+    The page rotation is applied so coordinates match the rendered raster.
+    """
+    fitz = _import_fitz()
+    matrix = page.rotation_matrix * fitz.Matrix(scale, scale)
+
+    words = page.get_text("words")
+    word_rects = [fitz.Rect(w[:4]) * matrix for w in words]
+    columns = {
+        "word_text": np.array([w[4] for w in words], dtype=str),
+        "word_x1": np.array([r.x0 for r in word_rects], dtype=np.float32),
+        "word_y1": np.array([r.y0 for r in word_rects], dtype=np.float32),
+        "word_x2": np.array([r.x1 for r in word_rects], dtype=np.float32),
+        "word_y2": np.array([r.y1 for r in word_rects], dtype=np.float32),
+        "word_block": np.array([w[5] for w in words], dtype=np.int32),
+        "word_line": np.array([w[6] for w in words], dtype=np.int32),
+    }
+
+    segments = np.array(_page_segments(page, matrix), dtype=np.float32).reshape(-1, 5)
+    for i, name in enumerate(SEGMENT_COLUMNS):
+        columns[f"segment_{name}"] = segments[:, i]
+
+    return columns
+
+
+def pack_columns(columns: Dict[str, np.ndarray]) -> bytes:
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **columns)
+    return buffer.getvalue()
+
+
+def unpack_columns(data: bytes) -> Dict[str, np.ndarray]:
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        return {name: npz[name] for name in npz.files}
+
+
+def _words_payload(columns: Dict[str, np.ndarray], mask=None) -> Dict[str, list]:
+    """Word columns as JSON lists, optionally filtered by a boolean mask"""
+    return {
+        name: (columns[f"word_{name}"] if mask is None else columns[f"word_{name}"][mask]).tolist()
+        for name in WORD_COLUMNS
+    }
+
+
+class PageVectorService(BaseService):
+    """Stores and queries extracted PDF text and geometry"""
+
+    # =====================
+    # EXTRACTION
+    # =====================
+
+    def extract_pdf(self, pdf_path: str, page_hashes: List[str], scale: float) -> int:
+        """
+        Extract every page of a PDF whose raster has no vectors stored yet.
+
+        Args:
+            pdf_path: PDF on local disk
+            page_hashes: Raster content hash of each page, in page order
+            scale: PDF points -> raster pixels
+
+        Returns:
+            Number of pages extracted
+        """
+        fitz = _import_fitz()
+        if not PDF_EXTRACT_VECTORS or fitz is None:
+            return 0
+
+        known = {
+            h for (h,) in self.db.query(PageVector.content_hash)
+            .filter(PageVector.content_hash.in_(set(page_hashes)))
+        }
+        pending = {}
+        for index, content_hash in enumerate(page_hashes):
+            if content_hash not in known:
+                pending.setdefault(content_hash, index)
+        if not pending:
+            return 0
+
+        try:
+            with fitz.open(pdf_path) as doc:
+                for content_hash, index in pending.items():
+                    columns = extract_page_columns(doc[index], scale)
+                    self.db.add(PageVector(
+                        content_hash=content_hash,
+                        word_count=len(columns["word_text"]),
+                        segment_count=len(columns["segment_x1"]),
+                        scale=scale,
+                        data=pack_columns(columns),
+                        text="\n".join(columns["word_text"].tolist()),
+                    ))
+        except Exception:
+            # Vectors are an add-on; never fail an upload over them
+            logger.exception("Vector extraction failed for %s", pdf_path)
+            return 0
+
+        return len(pending)
+
+    # =====================
+    # QUERIES
+    # =====================
+
+    def get_columns(self, content_hash: str) -> Optional[Dict[str, np.ndarray]]:
+        if not content_hash:
+            return None
+        record = self.db.query(PageVector).filter(PageVector.content_hash == content_hash).first()
+        return unpack_columns(record.data) if record else None
+
+    def get_page_vectors(self, page: Page) -> Dict:
+        """Columnar words and segments of a page (empty when not extracted)"""
+        columns = self.get_columns(page.content_hash)
+        if columns is None:
+            return {"page_id": page.id, "available": False, "words": None, "segments": None}
+
+        return {
+            "page_id": page.id,
+            "available": True,
+            "words": _words_payload(columns),
+            "segments": {
+                name: columns[f"segment_{name}"].tolist()
+                for name in SEGMENT_COLUMNS
+            },
+        }
+
+    def words_in_region(self, content_hash: str, box: tuple, margin: float = 0.0) -> Dict[str, list]:
+        """Words whose boxes intersect `box` (x1, y1, x2, y2) grown by `margin` pixels"""
+        columns = self.get_columns(content_hash)
+        if columns is None:
+            return _words_payload({f"word_{n}": np.array([]) for n in WORD_COLUMNS})
+
+        x1, y1, x2, y2 = box
+        mask = (
+            (columns["word_x2"] >= x1 - margin) & (columns["word_x1"] <= x2 + margin)
+            & (columns["word_y2"] >= y1 - margin) & (columns["word_y1"] <= y2 + margin)
+        )
+        return _words_payload(columns, mask)
+
+    def search_text(self, project_id: str, query: str, limit: int = 200) -> List[Dict]:
+        """
+        Case-insensitive substring search over the words of a project's pages.
+
+        Pages are filtered in SQL on their text column (trigram-indexed);
+        only matching pages have their blobs unpacked to locate the words.
+        """
+        needle = query.strip().lower()
+        if not needle:
+            return []
+
+        escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        rows = (
+            self.db.query(Page.id, Page.page_number, PageVector.data)
+            .join(PageVector, PageVector.content_hash == Page.content_hash)
+            .filter(
+                Page.project_id == project_id,
+                or_(
+                    PageVector.text.ilike(f"%{escaped}%", escape="\\"),
+                    # Extracted before the text column existed
+                    PageVector.text.is_(None),
+                ),
+            )
+            .order_by(Page.page_number)
+            .all()
+        )
+
+        hits = []
+        for page_id, page_number, data in rows:
+            columns = unpack_columns(data)
+            text = columns["word_text"]
+            if not len(text):
+                continue
+            matches = np.flatnonzero(np.char.find(np.char.lower(text), needle) >= 0)
+            for i in matches:
+                hits.append({
+                    "page_id": page_id,
+                    "page_number": page_number,
+                    "text": str(text[i]),
+                    "x1": float(columns["word_x1"][i]),
+                    "y1": float(columns["word_y1"][i]),
+                    "x2": float(columns["word_x2"][i]),
+                    "y2": float(columns["word_y2"][i]),
+                })
+                if len(hits) >= limit:
+                    return hits
+        return hits
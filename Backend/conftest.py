@@ -0,0 +1,7 @@
+import os
+
+# App modules read DATABASE_URL at import time; these tests never connect
+os.environ.setdefault("DATABASE_URL", "postgresql://test@localhost/test")
+
+# Manual script that runs the model on a real image, not a pytest module
+collect_ignore = ["test_tiled_detection.py"]
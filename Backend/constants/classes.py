@@ -7,3 +7,42 @@ HVAC_CLASSES = [
     "CirculationFan", "HVLSFan", "RadiationDamper",
     "DuctElbow", "DuctTransition", "FlexDuct",
 ]
+
+# Default component name and category for each detection class, used when
+# components are created from AI detections
+HVAC_CLASS_INFO = {
+    "GRD": ("Grille/Register/Diffuser", "Air Terminal"),
+    "SupplyDiffuser": ("Supply Diffuser", "Air Terminal"),
+    "ReturnDiffuser": ("Return Diffuser", "Air Terminal"),
+    "ExhaustDiffuser": ("Exhaust Diffuser", "Air Terminal"),
+    "SupplyGrille": ("Supply Grille", "Air Terminal"),
+    "ReturnGrille": ("Return Grille", "Air Terminal"),
+    "ExhaustGrille": ("Exhaust Grille", "Air Terminal"),
+    "ExhaustLouver": ("Exhaust Louver", "Louver"),
+    "IntakeLouver": ("Intake Louver", "Louver"),
+    "FireDamper": ("Fire Damper", "Damper"),
+    "SmokeDamper": ("Smoke Damper", "Damper"),
+    "MotorizedDamper": ("Motorized Damper", "Damper"),
+    "ManualDamper": ("Manual Damper", "Damper"),
+    "BackdraftDamper": ("Backdraft Damper", "Damper"),
+    "CableOperatedDamper": ("Cable Operated Damper", "Damper"),
+    "RadiationDamper": ("Radiation Damper", "Damper"),
+    "SupplyFan": ("Supply Fan", "Fan"),
+    "ReturnFan": ("Return Fan", "Fan"),
+    "ExhaustFan": ("Exhaust Fan", "Fan"),
+    "BackdraftFan": ("Backdraft Fan", "Fan"),
+    "CirculationFan": ("Circulation Fan", "Fan"),
+    "HVLSFan": ("HVLS Fan", "Fan"),
+    "FCU": ("Fan Coil Unit", "Equipment"),
+    "AHU": ("Air Handling Unit", "Equipment"),
+    "VAV": ("VAV Box", "Equipment"),
+    "RTU": ("Rooftop Unit", "Equipment"),
+    "DuctElbow": ("Duct Elbow", "Ductwork"),
+    "DuctTransition": ("Duct Transition", "Ductwork"),
+    "FlexDuct": ("Flex Duct", "Ductwork"),
+}
+
+
+def class_info(class_name: str):
+    """(name, category) for a detection class; unknown classes keep their name"""
+    return HVAC_CLASS_INFO.get(class_name, (class_name, "Other"))
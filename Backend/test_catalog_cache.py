@@ -0,0 +1,101 @@
+"""
+Tests for the catalog cache: TTL, LRU bound, invalidation and ETags.
+Run with: python -m pytest test_catalog_cache.py
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import catalog_cache as catalog_cache_module
+from app.services.catalog_cache import CatalogCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(catalog_cache_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+class Loader:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.payload
+
+
+def test_hit_until_ttl_expires(clock):
+    cache = CatalogCache(ttl=10)
+    loader = Loader({"materials": ["Steel"]})
+
+    assert cache.get("tree", loader)[0] == {"materials": ["Steel"]}
+    clock.value += 9
+    cache.get("tree", loader)
+    assert loader.calls == 1
+
+    clock.value += 2
+    cache.get("tree", loader)
+    assert loader.calls == 2
+
+
+def test_invalidate_drops_entries(clock):
+    cache = CatalogCache(ttl=60)
+    loader = Loader([1])
+
+    cache.get("materials", loader)
+    cache.invalidate()
+    cache.get("materials", loader)
+    assert loader.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = CatalogCache(ttl=60, max_entries=2)
+    loaders = {key: Loader([key]) for key in "abc"}
+
+    cache.get("a", loaders["a"])
+    cache.get("b", loaders["b"])
+    cache.get("a", loaders["a"])  # "b" is now least recently used
+    cache.get("c", loaders["c"])
+
+    assert list(cache._entries) == ["a", "c"]
+    cache.get("b", loaders["b"])
+    assert loaders["b"].calls == 2
+    assert loaders["a"].calls == 1
+
+
+def test_expired_entries_are_dropped_on_insert(clock):
+    cache = CatalogCache(ttl=10)
+    cache.get("old", Loader([1]))
+    clock.value += 11
+    cache.get("new", Loader([2]))
+
+    assert list(cache._entries) == ["new"]
+
+
+def test_empty_results_not_cached_when_disabled(clock):
+    cache = CatalogCache(ttl=60)
+    loader = Loader(None)
+
+    cache.get("model:unknown", loader, cache_empty=False)
+    cache.get("model:unknown", loader, cache_empty=False)
+    assert loader.calls == 2
+    assert not cache._entries
+
+
+def test_etag_depends_on_content_only():
+    first = CatalogCache.make_etag({"a": 1, "b": [1, 2]})
+
+    assert first == CatalogCache.make_etag({"b": [1, 2], "a": 1})
+    assert first != CatalogCache.make_etag({"a": 2, "b": [1, 2]})
+    assert first.startswith('"') and first.endswith('"')
+
+
+def test_get_returns_payload_etag(clock):
+    cache = CatalogCache(ttl=60)
+    payload, etag = cache.get("tree", Loader({"a": 1}))
+
+    assert etag == CatalogCache.make_etag(payload)
+    assert cache.get("tree", Loader({"a": 2})) == (payload, etag)
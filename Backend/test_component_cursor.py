@@ -0,0 +1,38 @@
+"""
+Tests for the keyset cursor used to page project components.
+Run with: python -m pytest test_component_cursor.py
+"""
+import base64
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.hvac_component_service import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 9, 30, 12, 345678)
+    component_id = "1b4e28ba-2fa1-11d2-883f-0016d3cca427"
+
+    cursor = _encode_cursor(created_at, component_id)
+
+    assert _decode_cursor(cursor) == (created_at, component_id)
+
+
+def test_cursor_is_url_safe():
+    cursor = _encode_cursor(datetime(2024, 1, 1), "?>?>?>")
+    assert "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    base64.urlsafe_b64encode(b"{}").decode(),
+    base64.urlsafe_b64encode(b'["yesterday", "abc"]').decode(),
+    base64.urlsafe_b64encode(b'["2024-01-01T00:00:00"]').decode(),
+])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor(cursor)
+    assert exc.value.status_code == 400
@@ -0,0 +1,121 @@
+"""
+Tests for format negotiation and the columnar / binary box encodings.
+Run with: python -m pytest test_detection_encoding.py
+"""
+import json
+import struct
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.services.detection_encoding import (
+    BINARY_MAGIC,
+    BINARY_MEDIA_TYPE,
+    BOX_KEYS,
+    COLUMNAR_MEDIA_TYPE,
+    boxes_to_dicts,
+    encode_binary,
+    encode_columnar,
+    negotiate_format,
+)
+
+# Rows in BOX_KEYS order: id, x1, y1, x2, y2, label, confidence, is_manual, is_edited
+ROWS = [
+    ("d1", 10.0, 20.0, 30.0, 40.0, "diffuser", 0.9, False, False),
+    ("d2", 1.5, 2.5, 3.5, 4.5, "grille", 0.75, True, False),
+    ("d3", 5.0, 6.0, 7.0, 8.0, "diffuser", 0.5, False, True),
+]
+
+
+def decode_binary(body):
+    magic, count, meta_length = struct.unpack_from("<4sII", body)
+    meta = json.loads(body[12:12 + meta_length])
+    offset = 12 + meta_length + (-meta_length % 4)
+    floats = np.frombuffer(body, dtype="<f4", count=5 * count, offset=offset).reshape(5, count)
+    offset += floats.nbytes
+    classes = np.frombuffer(body, dtype="<u2", count=count, offset=offset)
+    offset += classes.nbytes
+    flags = np.frombuffer(body, dtype=np.uint8, count=count, offset=offset)
+    assert offset + flags.nbytes == len(body)
+    return magic, count, meta, floats, classes, flags
+
+
+@pytest.mark.parametrize("accept, requested, expected", [
+    (None, None, "json"),
+    ("application/json", None, "json"),
+    (COLUMNAR_MEDIA_TYPE, None, "columnar"),
+    (f"{BINARY_MEDIA_TYPE};q=0.9, application/json", None, "binary"),
+    (BINARY_MEDIA_TYPE, "JSON", "json"),
+    (None, "columnar", "columnar"),
+])
+def test_negotiate_format(accept, requested, expected):
+    assert negotiate_format(accept, requested) == expected
+
+
+def test_negotiate_format_respects_allowed():
+    assert negotiate_format(BINARY_MEDIA_TYPE, None, allowed=("json", "columnar")) == "json"
+    with pytest.raises(HTTPException) as exc:
+        negotiate_format(None, "binary", allowed=("json", "columnar"))
+    assert exc.value.status_code == 400
+
+
+def test_boxes_to_dicts():
+    assert boxes_to_dicts(ROWS[:1]) == [dict(zip(BOX_KEYS, ROWS[0]))]
+
+
+def test_encode_columnar():
+    payload = encode_columnar(ROWS)
+
+    assert payload["count"] == 3
+    assert payload["classes"] == ["diffuser", "grille"]
+    assert payload["class"] == [0, 1, 0]
+    assert payload["id"] == ["d1", "d2", "d3"]
+    assert payload["x1"] == [10.0, 1.5, 5.0]
+    assert payload["is_manual"] == [0, 1, 0]
+    assert payload["is_edited"] == [0, 0, 1]
+
+
+def test_encode_columnar_shared_class_index():
+    class_index = {"grille": 0}
+    payload = encode_columnar(ROWS, class_index)
+
+    assert "classes" not in payload
+    assert payload["class"] == [1, 0, 1]
+    assert list(class_index) == ["grille", "diffuser"]
+
+
+def test_encode_columnar_empty():
+    payload = encode_columnar([])
+    assert payload["count"] == 0
+    assert payload["classes"] == [] and payload["id"] == [] and payload["class"] == []
+
+
+def test_encode_binary_layout():
+    body = encode_binary(ROWS, {"page_id": "p1"})
+    magic, count, meta, floats, classes, flags = decode_binary(body)
+
+    assert magic == BINARY_MAGIC
+    assert count == 3
+    assert meta == {"page_id": "p1", "classes": ["diffuser", "grille"], "ids": ["d1", "d2", "d3"]}
+    assert np.allclose(floats, [
+        [10.0, 1.5, 5.0],
+        [20.0, 2.5, 6.0],
+        [30.0, 3.5, 7.0],
+        [40.0, 4.5, 8.0],
+        [0.9, 0.75, 0.5],
+    ])
+    assert classes.tolist() == [0, 1, 0]
+    assert flags.tolist() == [0, 1, 2]
+
+
+def test_encode_binary_zero_rows():
+    body = encode_binary([])
+    magic, count, meta, floats, classes, flags = decode_binary(body)
+
+    assert magic == BINARY_MAGIC
+    assert count == 0
+    assert meta == {"classes": [], "ids": []}
+    assert floats.size == classes.size == flags.size == 0
+    # 12-byte header + 24-byte metadata (already 4-aligned), no columns
+    assert len(body) == 36
@@ -0,0 +1,59 @@
+"""
+Tests for header-only dimension probing and LazyImage.
+Run with: python -m pytest test_image_probe.py
+"""
+import io
+
+import pytest
+from PIL import Image
+
+from app.services.image_probe import LazyImage, probe_dimensions, probe_file
+
+
+def encode(format, size=(37, 23), mode="RGB", **params):
+    buffer = io.BytesIO()
+    Image.new(mode, size, "white").save(buffer, format=format, **params)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("format, params", [
+    ("PNG", {}),
+    ("JPEG", {}),
+    ("JPEG", {"progressive": True}),
+    ("WEBP", {"lossless": True}),
+    ("WEBP", {"quality": 80}),
+])
+def test_probe_dimensions(format, params):
+    assert probe_dimensions(encode(format, **params)) == (37, 23)
+
+
+def test_probe_file(tmp_path):
+    path = tmp_path / "page.png"
+    path.write_bytes(encode("PNG", size=(640, 480)))
+    assert probe_file(str(path)) == (640, 480)
+
+
+@pytest.mark.parametrize("data", [b"", b"not an image", encode("PNG")[:20]])
+def test_probe_rejects_unknown_or_truncated(data):
+    with pytest.raises(ValueError):
+        probe_dimensions(data)
+
+
+def test_lazy_image_decodes_on_demand():
+    image = LazyImage(encode("PNG"))
+    assert image.size == (37, 23)
+    assert image._image is None
+
+    assert image.image.size == (37, 23)
+    image.release()
+    assert image._image is None
+
+
+def test_lazy_image_falls_back_to_pil():
+    image = LazyImage(encode("BMP"))
+    assert image.size == (37, 23)
+
+
+def test_lazy_image_unreadable_raises_value_error():
+    with pytest.raises(ValueError):
+        LazyImage(b"not an image")
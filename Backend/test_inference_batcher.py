@@ -0,0 +1,83 @@
+"""
+Tests for MicroBatcher batching and failure handling, using a fake model.
+Run with: python -m pytest test_inference_batcher.py
+"""
+import time
+
+import numpy as np
+import pytest
+
+from app.services.inference_batcher import MicroBatcher
+
+
+class FakeModel:
+    """Records each batch and returns the tile sums as results"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, tiles, conf, verbose):
+        self.calls.append((len(tiles), conf))
+        if self.fail:
+            raise RuntimeError("model failed")
+        return [int(tile.sum()) for tile in tiles]
+
+
+def tile(value):
+    return np.full((2, 2), value, dtype=np.uint8)
+
+
+def test_tiles_are_batched_at_lowest_confidence():
+    model = FakeModel()
+    batcher = MicroBatcher(model, max_batch_size=3, max_wait_ms=500)
+
+    futures = [
+        batcher.submit(tile(1), 0.5),
+        batcher.submit(lambda: tile(2), 0.25),
+        batcher.submit(tile(3), 0.4),
+    ]
+
+    assert [f.result(timeout=5) for f in futures] == [4, 8, 12]
+    assert model.calls == [(3, 0.25)]
+
+    # Stats are updated just after the futures resolve
+    deadline = time.monotonic() + 5
+    while batcher.stats()["batches"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["tiles"] == 3
+    assert stats["full_batches"] == 1
+
+
+def test_failing_tile_only_fails_its_request():
+    model = FakeModel()
+    batcher = MicroBatcher(model, max_batch_size=3, max_wait_ms=500)
+
+    def broken():
+        raise OSError("tile read failed")
+
+    futures = [
+        batcher.submit(tile(1), 0.5),
+        batcher.submit(broken, 0.1),
+        batcher.submit(tile(3), 0.5),
+    ]
+
+    assert futures[0].result(timeout=5) == 4
+    assert futures[2].result(timeout=5) == 12
+    with pytest.raises(OSError):
+        futures[1].result(timeout=5)
+    # The failed tile's confidence does not lower the batch threshold
+    assert model.calls == [(2, 0.5)]
+
+
+def test_model_failure_fails_whole_batch():
+    batcher = MicroBatcher(FakeModel(fail=True), max_batch_size=2, max_wait_ms=500)
+
+    futures = [batcher.submit(tile(1), 0.5), batcher.submit(tile(2), 0.5)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+    assert batcher.stats()["batches"] == 0
@@ -0,0 +1,78 @@
+"""
+Tests for PackedBilevel and SharedImage (no model or database needed).
+Run with: python -m pytest test_shared_image.py
+"""
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services import shared_image
+from app.services.shared_image import PackedBilevel, SharedImage, as_pixel_array
+
+
+@pytest.fixture
+def same_process_attach(monkeypatch):
+    # attach() drops the block from this process's resource tracker, which
+    # is also the creator's here; keep it registered so unlink stays quiet
+    monkeypatch.setattr(shared_image.resource_tracker, "unregister", lambda *args: None)
+
+
+def make_bilevel(width=21, height=5, seed=0):
+    pixels = np.random.default_rng(seed).integers(0, 2, (height, width), dtype=np.uint8) * 255
+    return Image.fromarray(pixels).convert("1"), pixels
+
+
+def test_packed_bilevel_round_trip():
+    image, pixels = make_bilevel()
+    packed = PackedBilevel.from_image(image)
+
+    assert packed.shape == (5, 21)
+    assert packed.nbytes == 5 * 3  # 21 pixels -> 3 bytes per row
+    assert np.array_equal(packed[:, :], pixels)
+    assert np.array_equal(np.asarray(packed.to_image().convert("L")), pixels)
+
+
+def test_packed_bilevel_unaligned_slice():
+    image, pixels = make_bilevel()
+    packed = PackedBilevel.from_image(image)
+
+    region = packed[1:4, 3:19]
+    assert region.dtype == np.uint8
+    assert np.array_equal(region, pixels[1:4, 3:19])
+
+
+def test_as_pixel_array():
+    image, _ = make_bilevel()
+    assert isinstance(as_pixel_array(image), PackedBilevel)
+
+    rgb = Image.new("RGB", (4, 3), (10, 20, 30))
+    assert as_pixel_array(rgb).shape == (3, 4, 3)
+    assert as_pixel_array(Image.new("P", (4, 3))).shape == (3, 4, 3)
+
+    array = np.zeros((3, 4), dtype=np.uint8)
+    assert as_pixel_array(array) is array
+
+
+def test_shared_image_attach_and_view(same_process_attach):
+    pixels = np.arange(6 * 8 * 3, dtype=np.uint8).reshape(6, 8, 3)
+    with SharedImage.create(pixels) as shared:
+        attached = SharedImage.attach(shared.descriptor())
+        try:
+            assert attached.shape == (6, 8, 3)
+            assert np.array_equal(attached.view((2, 1), (4, 3)), pixels[1:4, 2:6])
+        finally:
+            attached.close()
+
+
+def test_shared_image_bilevel_stays_packed(same_process_attach):
+    image, pixels = make_bilevel()
+    with SharedImage.create(image) as shared:
+        descriptor = shared.descriptor()
+        assert descriptor["bilevel_width"] == 21
+        assert shared.shape == (5, 3)
+
+        attached = SharedImage.attach(descriptor)
+        try:
+            assert np.array_equal(attached.view((3, 1), (16, 3)), pixels[1:4, 3:19])
+        finally:
+            attached.close()
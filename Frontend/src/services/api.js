@@ -1,3 +1,5 @@
+import { COLUMNAR_MEDIA_TYPE, decodeProjectPages } from "../utils/boxPayload"
+
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:8000/api"
 
 async function handleResponse(res) {
@@ -81,9 +83,13 @@ export async function deleteProject(projectId) {
    PROJECT PAGES & UPLOADS
    ========================= */
 
+// Boxes arrive columnar (much smaller for dense pages) and are decoded
+// back to the usual bounding_boxes shape
 export async function getProjectPages(projectId) {
-  const res = await fetch(`${API_BASE}/projects/${projectId}/pages`)
-  return handleResponse(res)
+  const res = await fetch(`${API_BASE}/projects/${projectId}/pages`, {
+    headers: { Accept: COLUMNAR_MEDIA_TYPE },
+  })
+  return decodeProjectPages(await handleResponse(res))
 }
 
 export async function uploadProjectPDF(projectId, file) {
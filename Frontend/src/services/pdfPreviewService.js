@@ -116,20 +116,16 @@ class PDFPreviewService {
    */
   async uploadPagesToBackend(projectId, pages, onProgress = null) {
     const formData = new FormData()
-    formData.append('project_id', projectId)
-    formData.append('page_count', pages.length.toString())
     
-    // Add all page blobs
+    // Add all page blobs (file parts become pages in this order)
     pages.forEach((page, index) => {
       formData.append(`page_${index + 1}`, page.blob, `page_${index + 1}.png`)
-      formData.append(`page_${index + 1}_width`, page.width.toString())
-      formData.append(`page_${index + 1}_height`, page.height.toString())
     })
     
     const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:8000/api"
     
     try {
-      const response = await fetch(`${API_BASE}/projects/${projectId}/upload-pages`, {
+      const response = await fetch(`${API_BASE}/projects/${projectId}/pages/stream`, {
         method: 'POST',
         body: formData,
       })
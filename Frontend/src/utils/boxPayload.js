@@ -0,0 +1,40 @@
+// Decoder for the columnar bounding box format served by the backend
+// (see Backend/app/services/detection_encoding.py). Boxes come back in the
+// usual { id, x1, y1, x2, y2, label, confidence, is_manual, is_edited } shape.
+
+export const COLUMNAR_MEDIA_TYPE = "application/vnd.hvac.boxes+json"
+
+// Parallel arrays plus a class table -> array of box objects
+export function decodeColumnarBoxes(columns, classes = columns.classes) {
+  const boxes = new Array(columns.count)
+  for (let i = 0; i < columns.count; i++) {
+    boxes[i] = {
+      id: columns.id[i],
+      x1: columns.x1[i],
+      y1: columns.y1[i],
+      x2: columns.x2[i],
+      y2: columns.y2[i],
+      label: classes[columns.class[i]],
+      confidence: columns.confidence[i],
+      is_manual: columns.is_manual[i] === 1,
+      is_edited: columns.is_edited[i] === 1,
+    }
+  }
+  return boxes
+}
+
+// Project pages payload: every page's boxes index one shared class table.
+// Plain JSON payloads (e.g. from an older backend) pass through unchanged.
+export function decodeProjectPages(payload) {
+  if (payload.format !== "columnar") return payload
+  const decoded = {
+    ...payload,
+    pages: payload.pages.map(page => ({
+      ...page,
+      bounding_boxes: decodeColumnarBoxes(page.bounding_boxes, payload.classes),
+    })),
+  }
+  delete decoded.format
+  delete decoded.classes
+  return decoded
+}